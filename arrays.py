@@ -0,0 +1,363 @@
+from random import sample, randint
+
+import numpy as np
+
+from .crossoverers import TwoParentCrossoverer
+from .generators import SolutionEnforcingInitPopGenerator, SuddenDeathException
+from .genetic import GeneticSolver
+from .interfaces import Selector, lookup_fitness
+from .mutators import ProbabilityMutator
+
+
+class ArrayIndividual:
+    def __init__(self, population, index):
+        self._population = population
+        self._index = index
+
+    @property
+    def values(self):
+        return self._population.genes[self._index]
+
+    @property
+    def fitness(self):
+        fitness = self._population.fitness[self._index]
+        return None if np.isnan(fitness) else fitness.item()
+
+    @fitness.setter
+    def fitness(self, value):
+        self._population.fitness[self._index] = np.nan if value is None else value
+
+    @property
+    def age(self):
+        return self._population.age[self._index].item()
+
+    @age.setter
+    def age(self, value):
+        self._population.age[self._index] = value
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __setitem__(self, key, value):
+        values = self.values
+        if np.any(values[key] != value):
+            self.fitness = None
+        values[key] = value
+
+    def key(self):
+        return self.values.tobytes()
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+    def __reduce__(self):
+        return ArrayIndividual, (self._population.take([self._index]), 0)
+
+    def __repr__(self):
+        return "<Fit={}, Age={}, Gene={}>".format(self.fitness, self.age, self.values.tolist())
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class ArrayPopulation:
+    def __init__(self, genes, fitness=None, age=None):
+        self.genes = genes
+        self.fitness = np.full(len(genes), np.nan) if fitness is None else fitness
+        self.age = np.zeros(len(genes), dtype=np.int64) if age is None else age
+
+    def __len__(self):
+        return len(self.genes)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.genes, dtype=dtype)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self.take([item]).view(0)
+        return self.take(item)
+
+    def __setitem__(self, key, value):
+        if isinstance(value, ArrayPopulation):
+            self.genes[key], self.fitness[key], self.age[key] = value.genes, value.fitness, value.age
+            return
+        self.genes[key] = np.asarray(value)
+        self.fitness[key] = np.nan if value.fitness is None else value.fitness
+        self.age[key] = value.age
+
+    def __delitem__(self, key):
+        keep = np.ones(len(self), dtype=bool)
+        keep[key] = False
+        self.genes, self.fitness, self.age = self.genes[keep], self.fitness[keep], self.age[keep]
+
+    def __add__(self, other):
+        return ArrayPopulation(np.concatenate((self.genes, other.genes)),
+                               np.concatenate((self.fitness, other.fitness)),
+                               np.concatenate((self.age, other.age)))
+
+    def view(self, index):
+        return ArrayIndividual(self, index)
+
+    def take(self, indices):
+        return ArrayPopulation(self.genes[indices], self.fitness[indices], self.age[indices])
+
+    def copy(self):
+        return ArrayPopulation(self.genes.copy(), self.fitness.copy(), self.age.copy())
+
+    def sort_by_fitness(self):
+        order = np.argsort(-self.fitness, kind="stable")
+        self.genes, self.fitness, self.age = self.genes[order], self.fitness[order], self.age[order]
+
+    def best(self):
+        return self[int(np.nanargmax(self.fitness))]
+
+    def get_stats(self):
+        values = np.sort(self.fitness)[::-1]
+        return {"min": float(values[-1]),
+                "max": float(values[0]),
+                "median": float(values[len(values) // 2]),
+                "mean": float(values.mean()),
+                "distinct_cnt": int(1 + np.count_nonzero(values[1:] != values[:-1]))}
+
+
+def evaluate_fitness(fitness_evaluator, population, indices):
+    return np.asarray(fitness_evaluator(population.take(indices)), dtype=np.float64)
+
+
+def handle_non_solution(non_solution_handler, population, index):
+    individual = population.view(index)
+    handled = non_solution_handler(individual)
+    if handled is not individual:
+        population[index] = handled
+
+
+class ArraySolutionEnforcingInitPopGenerator(SolutionEnforcingInitPopGenerator):
+    def generate_genes(self, count):
+        raise NotImplementedError
+
+    def __call__(self):
+        ret = None
+
+        while ret is None or len(ret) < self.pop_size:
+            missing = self.pop_size - (0 if ret is None else len(ret))
+            batch = ArrayPopulation(self.generate_genes(self.get_batch_size(missing)))
+            self.attempt_cnt += len(batch)
+            self.batch_cnt += 1
+            self.last_batch_size = len(batch)
+            self.evaluation_cnt += len(batch)
+            batch.fitness = evaluate_fitness(self.fitness_evaluator, batch, range(len(batch)))
+            accepted = []
+            for i in range(len(batch)):
+                if len(accepted) == missing:
+                    break
+                try:
+                    handle_non_solution(self.non_solution_handler, batch, i)
+                except SuddenDeathException:
+                    self.rejected_cnt += 1
+                    continue
+                self.accepted_cnt += 1
+                accepted.append(i)
+            batch = batch.take(accepted)
+            ret = batch if ret is None else ret + batch
+        return ret
+
+
+class ArrayIntegerGeneInitPopGenerator(ArraySolutionEnforcingInitPopGenerator):
+    def __init__(self, pop_size, non_solution_handler, gene_size, range_from, range_to, over_generation=False,
+                 max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, over_generation, max_batch_size)
+        self.gene_size = gene_size
+        self.range_from = range_from
+        self.range_to = range_to
+
+    def generate_genes(self, count):
+        return np.random.randint(self.range_from, self.range_to + 1, size=(count, self.gene_size))
+
+
+class ArrayBinaryGeneInitPopGenerator(ArrayIntegerGeneInitPopGenerator):
+    def __init__(self, pop_size, non_solution_handler, gene_size, over_generation=False, max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, gene_size, 0, 1, over_generation, max_batch_size)
+
+
+class ArraySelector(Selector):
+    class _Record:
+        __slots__ = ("index", "fitness", "age")
+
+        def __init__(self, index, fitness, age):
+            self.index = index
+            self.fitness = fitness
+            self.age = age
+
+    def __init__(self, selector):
+        self.selector = selector
+
+    def __call__(self, population, count=None):
+        records = [self._Record(i, fitness, age)
+                   for i, (fitness, age) in enumerate(zip(population.fitness.tolist(), population.age.tolist()))]
+        selected = self.selector(records, count=count)
+        return population.take([record.index for record in selected])
+
+
+class ArrayTwoParentCrossoverer(TwoParentCrossoverer):
+    def crossover(self, first_parents, second_parents):
+        raise NotImplementedError
+
+    def __call__(self, parents, population):
+        first, second = [], []
+
+        while len(first) < len(population):
+            par = sample(range(len(parents)), 2)
+            for _ in range(self.get_num_offsprings()):
+                first.append(par[0])
+                second.append(par[1])
+
+        return ArrayPopulation(self.crossover(parents.genes[first], parents.genes[second]))
+
+
+class ArrayMultiPointCrossoverer(ArrayTwoParentCrossoverer):
+    def __init__(self, point_cnt_fn, num_offspring_fn):
+        super().__init__(num_offspring_fn)
+        self.point_cnt_fn = point_cnt_fn
+
+    def get_point_cnt(self):
+        return self.point_cnt_fn()
+
+    def crossover(self, first_parents, second_parents):
+        count, gene_length = first_parents.shape
+        switches = np.zeros((count, gene_length), dtype=bool)
+        for i in range(count):
+            switches[i, [p + 1 for p in sample(range(gene_length - 1), self.get_point_cnt())]] = True
+        switches[:, 0] = np.random.randint(0, 2, count).astype(bool)
+        from_second = np.logical_xor.accumulate(switches, axis=1)
+        return np.where(from_second, second_parents, first_parents)
+
+
+class ArrayOnePointCrossoverer(ArrayMultiPointCrossoverer):
+    def __init__(self, num_offspring_fn):
+        super().__init__(lambda: 1, num_offspring_fn)
+
+
+class ArrayUniformCrossoverer(ArrayTwoParentCrossoverer):
+    def __init__(self, num_offspring_fn, first_parent_probability_fn=lambda: 0.5):
+        super().__init__(num_offspring_fn)
+        self.first_parent_probability_fn = first_parent_probability_fn
+
+    def get_first_parent_probability(self):
+        return self.first_parent_probability_fn()
+
+    def crossover(self, first_parents, second_parents):
+        probabilities = np.array([self.get_first_parent_probability() for _ in range(len(first_parents))])
+        from_first = np.random.random(first_parents.shape) < probabilities[:, np.newaxis]
+        return np.where(from_first, first_parents, second_parents)
+
+
+class ArrayRandomResettingMutator(ProbabilityMutator):
+    def __init__(self, allowed_values, mutation_probability_fn, skip_sampling=False):
+        self.allowed_values = np.array(sorted(allowed_values))
+        self.skip_sampling = skip_sampling
+        super().__init__(mutation_probability_fn)
+
+    def get_random_replacements(self, not_these):
+        positions = np.searchsorted(self.allowed_values, not_these)
+        present = self.allowed_values[np.minimum(positions, len(self.allowed_values) - 1)] == not_these
+        choices = len(self.allowed_values) - present
+        rnd = (np.random.random(len(not_these)) * choices).astype(np.int64)
+        rnd += present & (rnd >= positions)
+        return self.allowed_values[rnd]
+
+    def mutated_cells(self, population):
+        # row and column indices of the mutated cells, in row-major order
+        probability = self.get_mutation_probability()
+        if not self.skip_sampling:
+            return np.nonzero(np.random.random(population.genes.shape) < probability)
+        count, gene_length = population.genes.shape
+        cells = np.zeros(0, dtype=np.int64)
+        if probability > 0 and count * gene_length > 0:
+            # the gaps between the mutated cells are geometrically distributed
+            probability = min(probability, 1)
+            expected = count * gene_length * probability
+            gaps = np.random.geometric(probability, int(expected + 4 * expected ** 0.5) + 16)
+            while gaps.sum() <= count * gene_length:
+                gaps = np.concatenate((gaps, np.random.geometric(probability, len(gaps))))
+            cells = np.cumsum(gaps) - 1
+            cells = cells[cells < count * gene_length]
+        return np.divmod(cells, gene_length)
+
+    def __call__(self, population):
+        cells = self.mutated_cells(population)
+        population.genes[cells] = self.get_random_replacements(population.genes[cells])
+        population.fitness[np.unique(cells[0])] = np.nan
+        return population
+
+
+class ArrayBitFlipMutator(ArrayRandomResettingMutator):
+    def __init__(self, mutation_probability_fn, skip_sampling=False):
+        super().__init__({0, 1}, mutation_probability_fn, skip_sampling)
+
+    def __call__(self, population):
+        cells = self.mutated_cells(population)
+        population.genes[cells] ^= 1
+        population.fitness[np.unique(cells[0])] = np.nan
+        return population
+
+
+class ArrayGeneticSolver(GeneticSolver):
+    supports_surrogates = False
+
+    def _check_population(self, param_name, param):
+        if not isinstance(param, ArrayPopulation):
+            raise TypeError("{} must return an ArrayPopulation, not a {}.".format(param_name,
+                                                                                 param.__class__.__name__))
+
+    @staticmethod
+    def _copy_for_mutation(next_generation):
+        return next_generation.copy()
+
+    def _calculate_fitness(self, genes):
+        if self._has_budget:
+            self._check_budget()
+        dirty = np.flatnonzero(np.isnan(genes.fitness))
+        if hasattr(self._fitness_calculator, "lookup_batch"):
+            lookup_fitness(self._fitness_calculator, [genes.view(i) for i in dirty])
+            dirty = dirty[np.isnan(genes.fitness[dirty])]
+        self._evaluation_cnt += len(dirty)
+        genes.fitness[dirty] = evaluate_fitness(self._fitness_evaluator, genes, dirty)
+
+    def _fitness_and_repair(self, next_generation, population):
+        pool = None
+        self._calculate_fitness(next_generation)
+        for i in range(len(next_generation)):
+            try:
+                handle_non_solution(self._non_solution_handler, next_generation, i)
+            except SuddenDeathException:
+                self._metrics.count("sudden_deaths")
+                if pool is None:
+                    pool = list(range(len(population)))
+                next_generation[i] = population[pool.pop(randint(0, len(pool)-1))]
+        return next_generation
+
+    @staticmethod
+    def _as_population(genes):
+        return genes
+
+    @staticmethod
+    def _sort_by_fitness(population):
+        population.sort_by_fitness()
+
+    @staticmethod
+    def _get_best(population):
+        return population.best()
+
+    @staticmethod
+    def _increase_age(population):
+        population.age += 1
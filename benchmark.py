@@ -0,0 +1,242 @@
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random, seed
+from time import perf_counter
+
+from .crossoverers import OnePointCrossoverer, MultiPointCrossoverer, UniformCrossoverer
+from .generators import BinaryGeneInitPopGenerator, IntegerGeneInitPopGenerator
+from .genetic import GeneticSolver
+from .interfaces import IncrementalFitnessCalculator
+from .mutation_preventers import EliteMutationPreventer
+from .mutators import BitFlipMutator, RandomResettingMutator, GreedyImprovementBitFlipMutator
+from .non_solution_handlers import DoNothingNonSolutionHandler
+from .selectors import (TournamentSelector, AgeSelector, RouletteSelector, RouletteNegativeFitnessSelector,
+                        StochasticUniversalSamplingSelector)
+from .terminators import GenerationCountTerminator
+
+
+class OneMaxFitnessCalculator(IncrementalFitnessCalculator):
+    def get_state(self, gene):
+        return sum(gene)
+
+    def get_fitness(self, state):
+        return state
+
+    def update_state(self, state, gene, index, value):
+        return state + value - gene[index]
+
+
+class KnapsackFitnessCalculator(IncrementalFitnessCalculator):
+    def __init__(self, gene_size, instance_seed):
+        rnd = Random(instance_seed)
+        self.weights = [rnd.randint(1, 100) for _ in range(gene_size)]
+        self.values = [rnd.randint(1, 100) for _ in range(gene_size)]
+        self.capacity = sum(self.weights) // 3
+
+    def get_state(self, gene):
+        wt = sum(w for w, bit in zip(self.weights, gene) if bit)
+        val = sum(v for v, bit in zip(self.values, gene) if bit)
+        return wt, val
+
+    def get_fitness(self, state):
+        wt, val = state
+        return val if wt <= self.capacity else self.capacity - wt
+
+    def update_state(self, state, gene, index, value):
+        wt, val = state
+        diff = value - gene[index]
+        return wt + diff * self.weights[index], val + diff * self.values[index]
+
+
+class IntegerRangeFitnessCalculator(IncrementalFitnessCalculator):
+    def __init__(self, gene_size, range_from, range_to, instance_seed):
+        rnd = Random(instance_seed)
+        self.target = [rnd.randint(range_from, range_to) for _ in range(gene_size)]
+
+    def get_state(self, gene):
+        return -sum(abs(value - target) for value, target in zip(gene, self.target))
+
+    def get_fitness(self, state):
+        return state
+
+    def update_state(self, state, gene, index, value):
+        return state + abs(gene[index] - self.target[index]) - abs(value - self.target[index])
+
+
+INTEGER_RANGE = (0, 9)
+
+
+def _binary_problem(fitness_calculator_fn):
+    return {
+        "fitness_calculator": fitness_calculator_fn,
+        "init_pop_generator": lambda pop_size, gene_size: BinaryGeneInitPopGenerator(
+            pop_size, DoNothingNonSolutionHandler(), gene_size),
+        "mutators": {
+            "BitFlipMutator": lambda gene_size: BitFlipMutator(lambda: 1 / gene_size),
+            "BitFlipMutator[skip_sampling]": lambda gene_size: BitFlipMutator(lambda: 1 / gene_size, True),
+            "GreedyImprovementBitFlipMutator": lambda gene_size: GreedyImprovementBitFlipMutator(lambda: 0.05),
+        },
+    }
+
+
+PROBLEMS = {
+    "onemax": _binary_problem(lambda gene_size: OneMaxFitnessCalculator()),
+    "knapsack": _binary_problem(lambda gene_size: KnapsackFitnessCalculator(gene_size, 0)),
+    "integer_range": {
+        "fitness_calculator": lambda gene_size: IntegerRangeFitnessCalculator(gene_size, *INTEGER_RANGE, 0),
+        "init_pop_generator": lambda pop_size, gene_size: IntegerGeneInitPopGenerator(
+            pop_size, DoNothingNonSolutionHandler(), gene_size, *INTEGER_RANGE),
+        "mutators": {
+            "RandomResettingMutator": lambda gene_size: RandomResettingMutator(
+                set(range(INTEGER_RANGE[0], INTEGER_RANGE[1] + 1)), lambda: 1 / gene_size),
+            "RandomResettingMutator[skip_sampling]": lambda gene_size: RandomResettingMutator(
+                set(range(INTEGER_RANGE[0], INTEGER_RANGE[1] + 1)), lambda: 1 / gene_size, True),
+        },
+    },
+}
+
+SELECTORS = {
+    "TournamentSelector": lambda count: TournamentSelector(lambda: 3, lambda: 1, lambda: count),
+    "AgeSelector": lambda count: AgeSelector(lambda: 1, lambda: count),
+    "RouletteSelector": lambda count: RouletteSelector(lambda: 1, lambda: count),
+    "RouletteNegativeFitnessSelector": lambda count: RouletteNegativeFitnessSelector(lambda: 1, lambda: count),
+    "StochasticUniversalSamplingSelector": lambda count: StochasticUniversalSamplingSelector(lambda: 1,
+                                                                                            lambda: count),
+}
+
+CROSSOVERERS = {
+    "OnePointCrossoverer": lambda: OnePointCrossoverer(lambda: 2),
+    "MultiPointCrossoverer": lambda: MultiPointCrossoverer(lambda: 3, lambda: 2),
+    "UniformCrossoverer": lambda: UniformCrossoverer(lambda: 2),
+}
+
+DEFAULT_SELECTOR = "TournamentSelector"
+DEFAULT_CROSSOVERER = "OnePointCrossoverer"
+
+
+def get_cases(problems, pop_sizes, gene_sizes):
+    # the default combination of each problem, then each operator varied one at a time
+    cases = []
+    for problem in problems:
+        mutators = list(PROBLEMS[problem]["mutators"])
+        combinations = [(DEFAULT_SELECTOR, DEFAULT_CROSSOVERER, mutators[0])]
+        combinations += [(s, DEFAULT_CROSSOVERER, mutators[0]) for s in SELECTORS if s != DEFAULT_SELECTOR]
+        combinations += [(DEFAULT_SELECTOR, c, mutators[0]) for c in CROSSOVERERS if c != DEFAULT_CROSSOVERER]
+        combinations += [(DEFAULT_SELECTOR, DEFAULT_CROSSOVERER, m) for m in mutators[1:]]
+        for pop_size in pop_sizes:
+            for gene_size in gene_sizes:
+                for selector, crossoverer, mutator in combinations:
+                    cases.append({"problem": problem, "pop_size": pop_size, "gene_size": gene_size,
+                                  "selector": selector, "crossoverer": crossoverer, "mutator": mutator})
+    return cases
+
+
+def get_case_key(case):
+    return "{problem}/pop={pop_size}/gene={gene_size}/{selector}/{crossoverer}/{mutator}".format(**case)
+
+
+def build_solver(case, generation_cnt):
+    problem = PROBLEMS[case["problem"]]
+    pop_size, gene_size = case["pop_size"], case["gene_size"]
+    return GeneticSolver(
+        init_pop_generator=problem["init_pop_generator"](pop_size, gene_size),
+        fitness_calculator=problem["fitness_calculator"](gene_size),
+        parent_selector=SELECTORS[case["selector"]](max(2, pop_size // 2)),
+        crossoverer=CROSSOVERERS[case["crossoverer"]](),
+        mutation_preventer=EliteMutationPreventer(lambda: 1),
+        non_solution_handler=DoNothingNonSolutionHandler(),
+        survivor_selector=TournamentSelector(lambda: 3, lambda: 1),
+        terminator=GenerationCountTerminator(generation_cnt),
+        mutators=[problem["mutators"][case["mutator"]](gene_size)],
+        renderers=[])
+
+
+def run_case(case, generation_cnt, random_seed, repeat=1, measure_memory=True):
+    # the fastest of the repeated runs is reported; every run is seeded the same, so they do the same work
+    elapsed = None
+    for _ in range(repeat):
+        seed(random_seed)
+        solver = build_solver(case, generation_cnt)
+        start = perf_counter()
+        best = solver.run()
+        elapsed = min(perf_counter() - start, elapsed or float("inf"))
+
+    result = {"seconds": elapsed,
+              "generations_per_second": generation_cnt / elapsed,
+              "evaluations_per_second": solver.get_evaluation_cnt() / elapsed,
+              "best_fitness": best.fitness}
+
+    if measure_memory:
+        seed(random_seed)
+        solver = build_solver(case, generation_cnt)
+        tracemalloc.start()
+        try:
+            solver.run()
+            result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        old = baseline[key]
+        for metric in ("generations_per_second", "evaluations_per_second"):
+            if result[metric] < old[metric] * (1 - tolerance):
+                regressions.append((key, metric, old[metric], result[metric]))
+        if "peak_memory" in result and "peak_memory" in old:
+            if result["peak_memory"] > old["peak_memory"] * (1 + tolerance):
+                regressions.append((key, "peak_memory", old["peak_memory"], result["peak_memory"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Measure solver throughput and operator cost.")
+    parser.add_argument("--problems", nargs="+", choices=list(PROBLEMS), default=list(PROBLEMS))
+    parser.add_argument("--pop-sizes", nargs="+", type=int, default=[50, 200])
+    parser.add_argument("--gene-sizes", nargs="+", type=int, default=[50, 500])
+    parser.add_argument("--generations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="report the fastest of this many runs")
+    parser.add_argument("--no-memory", action="store_true", help="do not measure peak memory")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results to this JSON file and flag regressions")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative slowdown or memory growth flagged as a regression")
+    parser.add_argument("--filter", default="", help="only run the cases whose key contains this string")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for case in get_cases(args.problems, args.pop_sizes, args.gene_sizes):
+        key = get_case_key(case)
+        if args.filter not in key:
+            continue
+        results[key] = result = run_case(case, args.generations, args.seed, args.repeat,
+                                           not args.no_memory)
+        print("{}: {:.2f} gen/s, {:.0f} eval/s{}".format(
+            key, result["generations_per_second"], result["evaluations_per_second"],
+            ", {:.1f} MiB peak".format(result["peak_memory"] / 2**20) if "peak_memory" in result else ""))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"generations": args.generations, "seed": args.seed, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for key, metric, old, new in regressions:
+            print("REGRESSION {}: {} {:.4g} -> {:.4g}".format(key, metric, old, new))
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+from itertools import chain, islice
+from random import getrandbits, randint, sample
+
+from .crossoverers import MultiPointCrossoverer, UniformCrossoverer
+from .gene import Gene
+from .generators import SolutionEnforcingInitPopGenerator
+from .mutators import ProbabilityMutator, get_mutated_loci
+
+_BYTE_BITS = [tuple((byte >> k) & 1 for k in range(8)) for byte in range(256)]
+_BYTE_INDICES = [tuple(k for k in range(8) if (byte >> k) & 1) for byte in range(256)]
+
+# probabilities of random masks are rounded to this many binary digits
+_PRECISION = 32
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    def popcount(value):
+        return bin(value).count("1")
+
+
+def _get_byte_cnt(size):
+    return (size + 7) // 8
+
+
+def random_mask(size, probability):
+    # each bit is set with the given probability; built from the binary expansion of the probability,
+    # least significant digit first: OR with random bits for a 1, AND with random bits for a 0
+    if probability <= 0:
+        return 0
+    numerator = round(probability * (1 << _PRECISION))
+    if numerator >= 1 << _PRECISION:
+        return (1 << size) - 1
+    if numerator == 0:
+        return 0
+    steps = _PRECISION
+    while not numerator & 1:
+        numerator >>= 1
+        steps -= 1
+    mask = 0
+    for _ in range(steps):
+        mask = mask | getrandbits(size) if numerator & 1 else mask & getrandbits(size)
+        numerator >>= 1
+    return mask
+
+
+def _rebuild_bit_gene(size, data, state):
+    gene = BitGene(size)
+    gene._data = data
+    gene.__dict__.update(state)
+    return gene
+
+
+class BitGene(Gene):
+    def __init__(self, size, value=0):
+        super().__init__()
+        self.size = size
+        # bit i is bit i % 8 of byte i // 8; bytes are shared with copies, a bytearray is owned
+        self._data = (value & ((1 << size) - 1)).to_bytes(_get_byte_cnt(size), "little")
+
+    def to_int(self):
+        return int.from_bytes(self._data, "little")
+
+    def to_bytes(self):
+        return bytes(self._data)
+
+    def set_int(self, value):
+        data = value.to_bytes(len(self._data), "little")
+        if data != self._data:
+            self.fitness = None
+        self._data = data
+
+    def flip(self, mask):
+        if mask:
+            self._data = (self.to_int() ^ mask).to_bytes(len(self._data), "little")
+            self.fitness = None
+
+    def popcount(self):
+        return popcount(self.to_int())
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return islice(chain.from_iterable(map(_BYTE_BITS.__getitem__, self._data)), self.size)
+
+    def __reversed__(self):
+        return reversed(list(self))
+
+    def __contains__(self, item):
+        return self.count(item) > 0
+
+    def __getitem__(self, item):
+        if not isinstance(item, int):
+            return list(self)[item]
+        if item < 0:
+            item += self.size
+        if item >= self.size:
+            return self._null_val
+        return (self._data[item >> 3] >> (item & 7)) & 1
+
+    def __setitem__(self, key, value):
+        if key < 0:
+            key += self.size
+        if not 0 <= key < self.size:
+            raise IndexError("BitGene has a fixed size.")
+        if self[key] == value:
+            return
+        if not isinstance(self._data, bytearray):
+            self._data = bytearray(self._data)
+        self._data[key >> 3] ^= 1 << (key & 7)
+        self.fitness = None
+
+    def _fixed_size(self, *args, **kwargs):
+        raise TypeError("BitGene has a fixed size.")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = __delitem__ = __iadd__ = __imul__ = \
+        _fixed_size
+
+    def count(self, item):
+        if item == 1:
+            return self.popcount()
+        if item == 0:
+            return self.size - self.popcount()
+        return 0
+
+    def index(self, item, *args):
+        return list(self).index(item, *args)
+
+    def key(self):
+        return self.size, bytes(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, BitGene):
+            return self.size == other.size and self._data == other._data
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = Gene.__hash__
+
+    def copy(self):
+        if isinstance(self._data, bytearray):
+            self._data = bytes(self._data)
+        gene = BitGene(0)
+        gene.__dict__.update(self.__dict__)
+        return gene
+
+    def copy_on_write(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce_ex__(self, protocol):
+        state = dict(self.__dict__)
+        del state["_data"]
+        return _rebuild_bit_gene, (self.size, bytes(self._data), state)
+
+    def __repr__(self):
+        return "<Fit={}, Age={}, Gene={}>".format(self.fitness, self.age, "".join(map(str, self)))
+
+
+class PackedWeights:
+    def __init__(self, weights):
+        weights = list(weights)
+        self.size = len(weights)
+        self.weights = None
+        self.planes = None
+        self.offset = 0
+        if all(isinstance(weight, int) for weight in weights):
+            # integer weights are split into bit planes, so a dot product is a popcount per plane
+            self.offset = min(weights, default=0)
+            shifted = [weight - self.offset for weight in weights]
+            width = max(shifted, default=0).bit_length()
+            digits = [format(weight, "0{}b".format(width)) for weight in reversed(shifted)]
+            self.planes = [int("".join(column), 2) for column in reversed(list(zip(*digits)))]
+        else:
+            self.weights = weights
+
+    def dot(self, gene):
+        if self.planes is not None:
+            value = gene.to_int()
+            return (sum(popcount(value & plane) << k for k, plane in enumerate(self.planes)) +
+                    self.offset * popcount(value))
+        total = 0
+        for byte_index, byte in enumerate(gene.to_bytes()):
+            if byte:
+                base = byte_index * 8
+                for k in _BYTE_INDICES[byte]:
+                    total += self.weights[base + k]
+        return total
+
+
+class PackedBinaryGeneInitPopGenerator(SolutionEnforcingInitPopGenerator):
+    def __init__(self, pop_size, non_solution_handler, gene_size, over_generation=False, max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, over_generation, max_batch_size)
+        self.gene_size = gene_size
+
+    def generate_gene(self):
+        return BitGene(self.gene_size, getrandbits(self.gene_size))
+
+
+def _merge(gene_length, first, second, mask):
+    # bits set in mask are taken from the second parent
+    first = first.to_int()
+    return BitGene(gene_length, first ^ ((first ^ second.to_int()) & mask))
+
+
+class PackedMultiPointCrossoverer(MultiPointCrossoverer):
+    def crossover(self, gene_length, parents):
+        points = sample(range(gene_length - 1), self.get_point_cnt())
+        full = (1 << gene_length) - 1
+        mask = full if randint(0, 1) else 0
+        for point in points:
+            mask ^= full ^ ((1 << (point + 1)) - 1)
+        return _merge(gene_length, parents[0], parents[1], mask)
+
+
+class PackedOnePointCrossoverer(PackedMultiPointCrossoverer):
+    def __init__(self, num_offspring_fn):
+        super().__init__(lambda: 1, num_offspring_fn)
+
+
+class PackedUniformCrossoverer(UniformCrossoverer):
+    def crossover(self, gene_length, parents):
+        mask = random_mask(gene_length, self.get_first_parent_probability())
+        return _merge(gene_length, parents[1], parents[0], mask)
+
+
+class PackedBitFlipMutator(ProbabilityMutator):
+    def __init__(self, mutation_probability_fn, skip_sampling=False):
+        super().__init__(mutation_probability_fn)
+        self.skip_sampling = skip_sampling
+
+    def __call__(self, population):
+        for gene in population:
+            if self.skip_sampling:
+                for i in get_mutated_loci(len(gene), self.get_mutation_probability()):
+                    gene[i] ^= 1
+                continue
+            gene.flip(random_mask(len(gene), self.get_mutation_probability()))
+        return population
@@ -0,0 +1,73 @@
+import os
+import pickle
+import zlib
+from threading import Thread
+from time import monotonic
+
+
+class Checkpointer:
+    MAGIC = b"GLCK\x01"
+
+    def __init__(self, path, generation_interval=None, time_interval=None, compression_level=6):
+        if generation_interval is None and time_interval is None:
+            raise ValueError("Either generation_interval or time_interval must be given.")
+        self.path = path
+        self.generation_interval = generation_interval
+        self.time_interval = time_interval
+        self.compression_level = compression_level
+        self._last_generation = 0
+        self._last_time = monotonic()
+        self._thread = None
+        self._error = None
+
+    def is_due(self, generation_cnt):
+        if self.generation_interval is not None and generation_cnt - self._last_generation >= self.generation_interval:
+            return True
+        return self.time_interval is not None and monotonic() - self._last_time >= self.time_interval
+
+    def is_writing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def save(self, state, wait=False):
+        # the state is pickled right away, compressing and writing it is left to a background thread;
+        # a checkpoint due while the previous one is still being written is postponed, unless wait is set
+        if self.is_writing() and not wait:
+            return False
+        self.wait()
+        data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        self._last_generation = state["generation_cnt"]
+        self._last_time = monotonic()
+        self._thread = Thread(target=self._write, args=(data,))
+        self._thread.start()
+        if wait:
+            self.wait()
+        return True
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write(self, data):
+        try:
+            data = zlib.compress(data, self.compression_level)
+            tmp_path = "{}.tmp".format(self.path)
+            with open(tmp_path, "wb") as f:
+                f.write(self.MAGIC)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self._error = e
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(cls.MAGIC):
+            raise ValueError("{} is not a checkpoint.".format(path))
+        return pickle.loads(zlib.decompress(data[len(cls.MAGIC):]))
@@ -0,0 +1,247 @@
+import os
+import sys
+from argparse import ArgumentParser
+from collections import deque
+from math import ceil
+from multiprocessing import Process
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, answer_challenge, deliver_challenge
+from threading import Condition, Thread
+from time import sleep
+
+from .interfaces import FitnessEvaluator, evaluate_batch
+
+
+def run_worker(address, authkey, reconnect=False, retry_interval=1.0):
+    # evaluates the batches sent by a DistributedFitnessEvaluator until it closes the connection
+    while True:
+        try:
+            connection = Client(address, authkey=authkey)
+        except OSError:
+            if not reconnect:
+                raise
+            sleep(retry_interval)
+            continue
+
+        fitness_calculator = None
+        with connection:
+            while True:
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    break
+                if message is None:
+                    break
+                kind, payload = message
+                if kind == "fitness_calculator":
+                    fitness_calculator = payload
+                    continue
+                task_id, genes = payload
+                try:
+                    result = list(evaluate_batch(fitness_calculator, genes))
+                except Exception as e:
+                    result = e
+                connection.send((task_id, result))
+
+        if not reconnect:
+            return
+        sleep(retry_interval)
+
+
+class DistributedFitnessEvaluator(FitnessEvaluator):
+    def __init__(self, address, authkey, chunk_size=None, pipeline_depth=2, task_timeout=None):
+        super().__init__()
+        if pipeline_depth < 1:
+            raise ValueError("pipeline_depth must be at least 1.")
+        self.address = address
+        self.authkey = authkey
+        self.chunk_size = chunk_size
+        self.pipeline_depth = pipeline_depth
+        self.task_timeout = task_timeout
+        self.lost_worker_cnt = 0
+        self._listener = None
+        self._condition = Condition()
+        self._closed = False
+        self._workers = set()
+        self._calculator_version = 0
+        self._tasks = deque()
+        self._batch_id = 0
+        self._results = {}
+        self._remaining = 0
+        self._error = None
+
+    def __del__(self):
+        self.close()
+
+    def set_fitness_calculator(self, fc):
+        with self._condition:
+            if fc is not self.fitness_calculator:
+                self._calculator_version += 1
+            super().set_fitness_calculator(fc)
+
+    def start(self):
+        if self._listener is None:
+            self._closed = False
+            # the workers are authenticated by the threads serving them, so that a client which does not
+            # answer does not keep the others from connecting
+            self._listener = Listener(self.address)
+            # the actual address, e.g. with the port chosen by the system if 0 was given
+            self.address = self._listener.address
+            Thread(target=self._accept, daemon=True).start()
+
+    def get_worker_cnt(self):
+        with self._condition:
+            return len(self._workers)
+
+    def get_chunk_size(self, gene_cnt):
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, ceil(gene_cnt / (4 * max(1, self.get_worker_cnt()))))
+
+    def close(self):
+        if self._listener is None:
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        # wakes the thread waiting for workers up, so that it sees the evaluator is closed
+        try:
+            Client(self.address).close()
+        except OSError:
+            pass
+        self._listener.close()
+        self._listener = None
+
+    def _accept(self):
+        listener = self._listener
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            if self._closed:
+                connection.close()
+                return
+            Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _next_tasks(self, in_flight):
+        # waits until there is something to send or to receive, returns the tasks to send
+        with self._condition:
+            while not self._closed and not self._tasks and not in_flight:
+                self._condition.wait()
+            if self._closed:
+                return None
+            tasks = []
+            while self._tasks and len(in_flight) + len(tasks) < self.pipeline_depth:
+                tasks.append(self._tasks.popleft())
+            return tasks, self._calculator_version, self.fitness_calculator
+
+    def _complete(self, task_id, result):
+        with self._condition:
+            batch_id, index = task_id
+            if batch_id != self._batch_id or index in self._results:
+                return
+            if isinstance(result, Exception):
+                self._error = result
+            self._results[index] = result
+            self._remaining -= 1
+            self._condition.notify_all()
+
+    def _serve(self, connection):
+        # keeps up to pipeline_depth tasks in flight on the worker, so that it has the next one at hand
+        # while the previous result is on its way back
+        in_flight = {}
+        calculator_version = None
+        try:
+            deliver_challenge(connection, self.authkey)
+            answer_challenge(connection, self.authkey)
+        except (AuthenticationError, EOFError, OSError):
+            connection.close()
+            return
+        with self._condition:
+            self._workers.add(connection)
+
+        try:
+            while True:
+                next_tasks = self._next_tasks(in_flight)
+                if next_tasks is None:
+                    connection.send(None)
+                    return
+                tasks, version, fitness_calculator = next_tasks
+                if tasks and version != calculator_version:
+                    connection.send(("fitness_calculator", fitness_calculator))
+                    calculator_version = version
+                for task_id, genes in tasks:
+                    in_flight[task_id] = genes
+                    connection.send(("evaluate", (task_id, genes)))
+                if in_flight:
+                    if self.task_timeout is not None and not connection.poll(self.task_timeout):
+                        raise TimeoutError
+                    task_id, result = connection.recv()
+                    del in_flight[task_id]
+                    self._complete(task_id, result)
+        except (EOFError, OSError):
+            # the worker is lost, the tasks it did not finish go back to the queue
+            with self._condition:
+                self.lost_worker_cnt += 1
+                self._tasks.extendleft(task for task in in_flight.items() if task[0][0] == self._batch_id)
+                self._condition.notify_all()
+        finally:
+            with self._condition:
+                self._workers.discard(connection)
+            connection.close()
+
+    def __call__(self, genes):
+        if len(genes) == 0:
+            return []
+        self.start()
+        chunk_size = self.get_chunk_size(len(genes))
+        chunks = [genes[i:i + chunk_size] for i in range(0, len(genes), chunk_size)]
+
+        with self._condition:
+            self._batch_id += 1
+            self._results = {}
+            self._remaining = len(chunks)
+            self._error = None
+            self._tasks = deque(((self._batch_id, i), chunk) for i, chunk in enumerate(chunks))
+            self._condition.notify_all()
+            # the batch waits for workers to connect, if there are none
+            while self._remaining and self._error is None:
+                self._condition.wait()
+            if self._error is not None:
+                self._tasks.clear()
+                raise self._error
+            return [fitness for i in range(len(chunks)) for fitness in self._results[i]]
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "localhost", int(port)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Evaluate fitness for a DistributedFitnessEvaluator.")
+    parser.add_argument("address", help="the HOST:PORT of the evaluator")
+    parser.add_argument("--processes", type=int, default=1, help="the number of worker processes to start")
+    parser.add_argument("--reconnect", action="store_true",
+                        help="keep reconnecting to the evaluator, instead of exiting when it closes")
+    args = parser.parse_args(argv)
+
+    authkey = os.environ.get("GENETIC_AUTHKEY")
+    if not authkey:
+        parser.error("the GENETIC_AUTHKEY environment variable must hold the authentication key")
+    address = parse_address(args.address)
+
+    processes = [Process(target=run_worker, args=(address, authkey.encode(), args.reconnect))
+                 for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from math import ceil
+from multiprocessing import Pool, cpu_count
+
+from .interfaces import FitnessEvaluator, evaluate_batch
+
+
+class SerialFitnessEvaluator(FitnessEvaluator):
+    def __call__(self, genes):
+        return evaluate_batch(self.fitness_calculator, genes)
+
+
+_worker_fitness_calculator = None
+
+
+def _init_worker(fitness_calculator):
+    global _worker_fitness_calculator
+    _worker_fitness_calculator = fitness_calculator
+
+
+def _evaluate_in_worker(genes):
+    return list(evaluate_batch(_worker_fitness_calculator, genes))
+
+
+class ProcessPoolFitnessEvaluator(FitnessEvaluator):
+    def __init__(self, workers=None, chunk_size=None):
+        super().__init__()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def __del__(self):
+        self.close()
+
+    def set_fitness_calculator(self, fc):
+        if fc is not self.fitness_calculator:
+            self.close()
+        super().set_fitness_calculator(fc)
+
+    def get_pool(self):
+        if self._pool is None:
+            self._pool = Pool(self.workers, initializer=_init_worker, initargs=(self.fitness_calculator,))
+        return self._pool
+
+    def get_chunk_size(self, gene_cnt):
+        if self.chunk_size:
+            return self.chunk_size
+        return max(1, ceil(gene_cnt / (4 * (self.workers or cpu_count()))))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __call__(self, genes):
+        if len(genes) == 0:
+            return []
+        chunk_size = self.get_chunk_size(len(genes))
+        chunks = [genes[i:i + chunk_size] for i in range(0, len(genes), chunk_size)]
+        return [fitness for chunk in self.get_pool().map(_evaluate_in_worker, chunks, chunksize=1)
+                for fitness in chunk]
@@ -0,0 +1,168 @@
+import os
+import pickle
+import sqlite3
+from collections import OrderedDict
+from hashlib import blake2b
+
+from .interfaces import FitnessCalculator, evaluate_batch
+
+
+class CachingFitnessCalculator(FitnessCalculator):
+    def __init__(self, fitness_calculator, max_size=None):
+        self.fitness_calculator = fitness_calculator
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+
+    def get_size(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+
+    def _store(self, key, fitness):
+        self._cache[key] = fitness
+        if self.max_size is not None and len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def __call__(self, gene):
+        key = gene.key()
+        try:
+            fitness = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            fitness = self.fitness_calculator(gene)
+            self._store(key, fitness)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return fitness
+
+    def evaluate_batch(self, genes):
+        keys = [gene.key() for gene in genes]
+        known = {}
+        missing = {}
+        for key, gene in zip(keys, genes):
+            if key in known or key in missing:
+                self.hits += 1
+            elif key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                known[key] = self._cache[key]
+            else:
+                self.misses += 1
+                missing[key] = gene
+
+        known.update(zip(missing, evaluate_batch(self.fitness_calculator, list(missing.values()))))
+        for key in missing:
+            self._store(key, known[key])
+        return [known[key] for key in keys]
+
+
+class SqliteFitnessStore:
+    # the number of digests in a single query, below SQLite's limit of query parameters
+    QUERY_SIZE = 500
+
+    def __init__(self, path, problem_id, max_size=None, timeout=30.0):
+        self.path = path
+        self.problem_id = problem_id
+        self.max_size = max_size
+        self.timeout = timeout
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
+
+    def get_connection(self):
+        # connections are not shared between processes, a forked or unpickled store opens its own
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS fitness (problem TEXT NOT NULL, "
+                                     "digest BLOB NOT NULL, fitness BLOB NOT NULL, PRIMARY KEY (problem, digest))")
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    @staticmethod
+    def get_digest(gene):
+        return blake2b(repr(gene.key()).encode(), digest_size=16).digest()
+
+    def get_many(self, genes):
+        digests = [self.get_digest(gene) for gene in genes]
+        connection = self.get_connection()
+        known = {}
+        for i in range(0, len(digests), self.QUERY_SIZE):
+            chunk = digests[i:i + self.QUERY_SIZE]
+            rows = connection.execute("SELECT digest, fitness FROM fitness WHERE problem = ? AND digest IN ({})".format(
+                ", ".join("?" * len(chunk))), [self.problem_id] + chunk)
+            known.update((digest, pickle.loads(fitness)) for digest, fitness in rows)
+        return [known.get(digest) for digest in digests]
+
+    def put_many(self, genes, fitnesses):
+        rows = [(self.problem_id, self.get_digest(gene), pickle.dumps(fitness))
+                for gene, fitness in zip(genes, fitnesses)]
+        if not rows:
+            return
+        connection = self.get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR REPLACE INTO fitness VALUES (?, ?, ?)", rows)
+            if self.max_size is not None:
+                # the oldest entries of the problem are evicted first, other problems keep theirs
+                excess = self.get_size() - self.max_size
+                if excess > 0:
+                    connection.execute("DELETE FROM fitness WHERE rowid IN (SELECT rowid FROM fitness "
+                                       "WHERE problem = ? ORDER BY rowid LIMIT ?)", (self.problem_id, excess))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get_size(self):
+        return self.get_connection().execute("SELECT COUNT(*) FROM fitness WHERE problem = ?",
+                                             (self.problem_id,)).fetchone()[0]
+
+    def clear(self):
+        self.get_connection().execute("DELETE FROM fitness WHERE problem = ?", (self.problem_id,))
+
+
+class PersistentFitnessCalculator(FitnessCalculator):
+    def __init__(self, fitness_calculator, store):
+        self.fitness_calculator = fitness_calculator
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, gene):
+        return self.evaluate_batch([gene])[0]
+
+    def lookup_batch(self, genes):
+        # the genes not found are counted as misses once they are evaluated
+        fitnesses = self.store.get_many(genes)
+        self.hits += sum(fitness is not None for fitness in fitnesses)
+        return fitnesses
+
+    def evaluate_batch(self, genes):
+        fitnesses = self.store.get_many(genes)
+        missing = [i for i, fitness in enumerate(fitnesses) if fitness is None]
+        self.hits += len(fitnesses) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            missing_genes = [genes[i] for i in missing]
+            computed = evaluate_batch(self.fitness_calculator, missing_genes)
+            self.store.put_many(missing_genes, computed)
+            for i, fitness in zip(missing, computed):
+                fitnesses[i] = fitness
+        return fitnesses
@@ -17,14 +17,170 @@ class Gene(list):
             return self._null_val
         return super().__getitem__(item)
 
+    def key(self):
+        return tuple(self)
+
+    def copy_on_write(self):
+        return CopyOnWriteGene(self)
+
     def __hash__(self):
-        h = 0
-        for item in self:
-            h = (h + hash(item)) % 2147483647
-        return h
+        return hash(self.key())
 
     def __repr__(self):
         return "<Fit={}, Age={}, Gene={}>".format(self.fitness, self.age, super().__repr__())
 
     def __str__(self):
         return self.__repr__()
+
+
+def _rebuild_gene(items, state):
+    gene = Gene()
+    list.extend(gene, items)
+    gene.__dict__.update(state)
+    return gene
+
+
+class CopyOnWriteGene(Gene):
+    def __init__(self, source):
+        super().__init__(source._null_val)
+        self.fitness = source.fitness
+        self.age = source.age
+        if isinstance(source, CopyOnWriteGene) and not source.is_materialized():
+            source = source._source
+        self._source = source
+
+    def is_materialized(self):
+        return self._source is None
+
+    def materialize(self):
+        if self._source is not None:
+            list.extend(self, self._source)
+            self._source = None
+
+    def _get_data(self):
+        return self if self._source is None else self._source
+
+    def _write(self):
+        self.materialize()
+        self.fitness = None
+
+    def __len__(self):
+        if self._source is None:
+            return super().__len__()
+        return len(self._source)
+
+    def __iter__(self):
+        if self._source is None:
+            return super().__iter__()
+        return iter(self._source)
+
+    def __reversed__(self):
+        return list.__reversed__(self._get_data())
+
+    def __contains__(self, item):
+        return list.__contains__(self._get_data(), item)
+
+    def __getitem__(self, item):
+        if self._source is None:
+            return super().__getitem__(item)
+        return self._source[item]
+
+    def __setitem__(self, key, value):
+        self.materialize()
+        return super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._write()
+        return super().__delitem__(key)
+
+    @staticmethod
+    def _get_other_data(other):
+        return other._get_data() if isinstance(other, CopyOnWriteGene) else other
+
+    def __eq__(self, other):
+        return list.__eq__(self._get_data(), self._get_other_data(other))
+
+    def __ne__(self, other):
+        return list.__ne__(self._get_data(), self._get_other_data(other))
+
+    def __lt__(self, other):
+        return list.__lt__(self._get_data(), self._get_other_data(other))
+
+    def __le__(self, other):
+        return list.__le__(self._get_data(), self._get_other_data(other))
+
+    def __gt__(self, other):
+        return list.__gt__(self._get_data(), self._get_other_data(other))
+
+    def __ge__(self, other):
+        return list.__ge__(self._get_data(), self._get_other_data(other))
+
+    def __add__(self, other):
+        return list.__add__(list(self._get_data()), self._get_other_data(other))
+
+    def __radd__(self, other):
+        return list(other) + list(self._get_data())
+
+    def __mul__(self, other):
+        return list.__mul__(list(self._get_data()), other)
+
+    __rmul__ = __mul__
+
+    def __iadd__(self, other):
+        self._write()
+        return super().__iadd__(other)
+
+    def __imul__(self, other):
+        self._write()
+        return super().__imul__(other)
+
+    __hash__ = Gene.__hash__
+
+    def __reduce_ex__(self, protocol):
+        state = dict(self.__dict__)
+        del state["_source"]
+        return _rebuild_gene, (list(self), state)
+
+    def append(self, item):
+        self._write()
+        return super().append(item)
+
+    def extend(self, items):
+        self._write()
+        return super().extend(items)
+
+    def insert(self, index, item):
+        self._write()
+        return super().insert(index, item)
+
+    def pop(self, index=-1):
+        self._write()
+        return super().pop(index)
+
+    def remove(self, item):
+        self._write()
+        return super().remove(item)
+
+    def clear(self):
+        self._write()
+        return super().clear()
+
+    def reverse(self):
+        self._write()
+        return super().reverse()
+
+    def sort(self, *args, **kwargs):
+        self._write()
+        return super().sort(*args, **kwargs)
+
+    def count(self, item):
+        return list.count(self._get_data(), item)
+
+    def index(self, *args):
+        return list.index(self._get_data(), *args)
+
+    def copy(self):
+        return list(self)
+
+    def __repr__(self):
+        return "<Fit={}, Age={}, Gene={}>".format(self.fitness, self.age, list(self))
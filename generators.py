@@ -1,7 +1,9 @@
+from math import ceil
 from random import randint
 
+from .evaluators import SerialFitnessEvaluator
 from .gene import Gene
-from .interfaces import InitPopGenerator
+from .interfaces import InitPopGenerator, lookup_fitness
 
 
 class SuddenDeathException(Exception):
@@ -9,14 +11,43 @@ class SuddenDeathException(Exception):
 
 
 class SolutionEnforcingInitPopGenerator(InitPopGenerator):
-    def __init__(self, pop_size, non_solution_handler):
+    def __init__(self, pop_size, non_solution_handler, over_generation=False, max_batch_size=None):
         self.pop_size = pop_size
         self.fitness_calculator = None
+        self.fitness_evaluator = None
         self.non_solution_handler = non_solution_handler
+        self.over_generation = over_generation
+        self.max_batch_size = max_batch_size or 10 * pop_size
+        self.attempt_cnt = 0
+        self.accepted_cnt = 0
+        self.rejected_cnt = 0
+        self.batch_cnt = 0
+        self.last_batch_size = 0
 
     def set_fitness_calculator(self, fc):
         self.fitness_calculator = fc
         self.non_solution_handler.set_fitness_calculator(fc)
+        self.fitness_evaluator = SerialFitnessEvaluator()
+        self.fitness_evaluator.set_fitness_calculator(fc)
+
+    def set_fitness_evaluator(self, fe):
+        self.fitness_evaluator = fe
+
+    def get_feasibility_rate(self):
+        handled = self.accepted_cnt + self.rejected_cnt
+        return self.accepted_cnt / handled if handled else None
+
+    def get_attempts_per_accepted(self):
+        return self.attempt_cnt / self.accepted_cnt if self.accepted_cnt else None
+
+    def get_batch_size(self, missing):
+        # without over-generation, exactly the missing genes are generated; with it, enough of them to fill
+        # the population at the acceptance rate observed so far, or twice the last batch if none were accepted
+        if not self.over_generation or self.attempt_cnt == 0:
+            return missing
+        if self.accepted_cnt == 0:
+            return min(2 * self.last_batch_size, self.max_batch_size)
+        return min(max(missing, ceil(missing * self.attempt_cnt / self.accepted_cnt)), self.max_batch_size)
 
     def generate_gene(self):
         raise NotImplementedError
@@ -28,19 +59,31 @@ class SolutionEnforcingInitPopGenerator(InitPopGenerator):
         ret = []
 
         while len(ret) < self.pop_size:
-            gene = self.generate_gene()
-            gene.fitness = self.fitness_calculator(gene)
-            try:
-                gene = self.handle_non_solution(gene)
-            except SuddenDeathException:
-                continue
-            ret.append(gene)
+            genes = [self.generate_gene() for _ in range(self.get_batch_size(self.pop_size - len(ret)))]
+            self.attempt_cnt += len(genes)
+            self.batch_cnt += 1
+            self.last_batch_size = len(genes)
+            missing = lookup_fitness(self.fitness_calculator, genes)
+            self.evaluation_cnt += len(missing)
+            for gene, fitness in zip(missing, self.fitness_evaluator(missing)):
+                gene.fitness = fitness
+            for gene in genes:
+                if len(ret) == self.pop_size:
+                    break
+                try:
+                    gene = self.handle_non_solution(gene)
+                except SuddenDeathException:
+                    self.rejected_cnt += 1
+                    continue
+                self.accepted_cnt += 1
+                ret.append(gene)
         return ret
 
 
 class IntegerGeneInitPopGenerator(SolutionEnforcingInitPopGenerator):
-    def __init__(self, pop_size,  non_solution_handler, gene_size, range_from, range_to):
-        super().__init__(pop_size, non_solution_handler)
+    def __init__(self, pop_size,  non_solution_handler, gene_size, range_from, range_to, over_generation=False,
+                 max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, over_generation, max_batch_size)
         self.gene_size = gene_size
         self.range_from = range_from
         self.range_to = range_to
@@ -53,5 +96,5 @@ class IntegerGeneInitPopGenerator(SolutionEnforcingInitPopGenerator):
 
 
 class BinaryGeneInitPopGenerator(IntegerGeneInitPopGenerator):
-    def __init__(self, pop_size, non_solution_handler, gene_size):
-        super().__init__(pop_size, non_solution_handler, gene_size, 0, 1)
+    def __init__(self, pop_size, non_solution_handler, gene_size, over_generation=False, max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, gene_size, 0, 1, over_generation, max_batch_size)
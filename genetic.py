@@ -1,10 +1,18 @@
-from copy import deepcopy
-from random import randint
-from signal import signal, SIGINT
-
+import sys
+from contextlib import contextmanager
+from functools import reduce
+from math import ceil
+from operator import add
+from random import randint, getstate, setstate
+from signal import signal, getsignal, SIGINT
+
+from .checkpoints import Checkpointer
+from .evaluators import SerialFitnessEvaluator
 from .gene import Gene
 from .generators import SuddenDeathException
-from .interfaces import Renderer, Mutator
+from .interfaces import Renderer, Mutator, FitnessEvaluator, BudgetExhaustedException, lookup_fitness
+from .metrics import Metrics, NullMetrics
+from .population import SortedPopulation
 
 
 class SIGINT_handler:
@@ -16,7 +24,42 @@ class SIGINT_handler:
         self.SIGINT = True
 
 
+class GenerationSnapshot:
+    # the state of a run after a generation; the statistics are taken when it is created, but the population
+    # is the solver's own, not a copy, and is only valid until the run is advanced
+    __slots__ = ("population", "best", "generation_cnt", "evaluation_cnt", "terminated", "stats")
+
+    def __init__(self, population, best, generation_cnt, evaluation_cnt, terminated):
+        self.population = population
+        self.best = best
+        self.generation_cnt = generation_cnt
+        self.evaluation_cnt = evaluation_cnt
+        self.terminated = terminated
+        self.stats = population.get_stats()
+
+    def __repr__(self):
+        return "<Generation={}, Best={}, Evaluations={}, Terminated={}>".format(
+            self.generation_cnt, self.best.fitness, self.evaluation_cnt, self.terminated)
+
+
+@contextmanager
+def handling_sigint(sigint_handler, enabled=True):
+    # installs the handler for the duration of the block, then restores the previous one
+    if not enabled:
+        yield
+        return
+    previous = getsignal(SIGINT)
+    sigint_handler.SIGINT = False
+    signal(SIGINT, sigint_handler.signal_handler)
+    try:
+        yield
+    finally:
+        signal(SIGINT, previous)
+
+
 class GeneticSolver:
+    supports_surrogates = True
+
     def __init__(self,
                  init_pop_generator,
                  fitness_calculator,
@@ -27,7 +70,12 @@ class GeneticSolver:
                  survivor_selector,
                  terminator,
                  mutators=(),
-                 renderers=()):
+                 renderers=(),
+                 fitness_evaluator=None,
+                 metrics_sink=None,
+                 checkpointer=None,
+                 surrogate=None,
+                 handle_sigint=False):
 
         self._init_pop_generator = None
         self._fitness_calculator = None
@@ -50,8 +98,14 @@ class GeneticSolver:
 
         self._non_solution_handler.set_fitness_calculator(self._fitness_calculator)
 
+        self._fitness_evaluator = fitness_evaluator or SerialFitnessEvaluator()
+        if not isinstance(self._fitness_evaluator, FitnessEvaluator):
+            raise TypeError("fitness_evaluator must be a FitnessEvaluator, not {}.".format(
+                self._fitness_evaluator.__class__.__name__))
+        self._fitness_evaluator.set_fitness_calculator(self._fitness_calculator)
+
         self._sigint_handler = SIGINT_handler()
-        signal(SIGINT, self._sigint_handler.signal_handler)
+        self.handle_sigint = handle_sigint
 
         self._renderers = renderers
         self._list_of_types_check("renderers", self._renderers, Renderer)
@@ -62,6 +116,27 @@ class GeneticSolver:
         for mutator in self._mutators:
             mutator.set_fitness_calculator(self._fitness_calculator)
 
+        # terminators with a budget are also checked within the phases which calculate fitness, except for
+        # the generation of the initial population, which is always done whole
+        self._has_budget = hasattr(self._terminator, "is_exhausted")
+        self._generating_init_pop = False
+        if self._has_budget:
+            for component in self._mutators + [self._non_solution_handler]:
+                if hasattr(component, "set_budget_check"):
+                    component.set_budget_check(self._check_budget)
+
+        self._metrics = NullMetrics() if metrics_sink is None else Metrics(metrics_sink)
+        self._mutator_phases = ["mutator[{}]:{}".format(i, mutator.__class__.__name__)
+                                for i, mutator in enumerate(self._mutators)]
+        self._evaluation_cnt = 0
+        self._checkpointer = checkpointer
+        if surrogate is not None and not self.supports_surrogates:
+            raise TypeError("{} does not support surrogates.".format(self.__class__.__name__))
+        self._surrogate = surrogate
+        self._injected = []
+        self._stop_requested = False
+        self._snapshots = None
+
     def _assign_init_param(self, param_name, param):
         if not hasattr(param, "__call__"):
             raise TypeError("{} must be callable.".format(param_name))
@@ -77,89 +152,227 @@ class GeneticSolver:
                 raise TypeError("Items in {} list must be {}s, not {}.".format(param_name, t.__name__,
                                                                                item.__class__.__name__))
 
+    def _check_population(self, param_name, param):
+        self._list_of_types_check(param_name, param, Gene)
+
+    def _population_check(self, param_name, param):
+        with self._metrics.measure("type_checks"):
+            self._check_population(param_name, param)
+
+    def get_evaluation_cnt(self):
+        components = [self._init_pop_generator, self._non_solution_handler,
+                      getattr(self._init_pop_generator, "non_solution_handler", None)] + self._mutators
+        unique = {id(component): component for component in components}
+        return self._evaluation_cnt + sum(getattr(component, "evaluation_cnt", 0) for component in unique.values())
+
     def _generate_init_pop(self):
         self._init_pop_generator.set_fitness_calculator(self._fitness_calculator)
-        pop = self._init_pop_generator()
-        self._list_of_types_check("init_pop_generator", pop, Gene)
+        self._init_pop_generator.set_fitness_evaluator(self._fitness_evaluator)
+        # the non-solution handler is usually shared with the init-pop generator, its evaluations count towards
+        # the budget, but do not end the run before it has started
+        self._generating_init_pop = True
+        try:
+            pop = self._init_pop_generator()
+        finally:
+            self._generating_init_pop = False
+        self._population_check("init_pop_generator", pop)
+        if hasattr(self._init_pop_generator, "attempt_cnt"):
+            self._metrics.count("init_pop_attempts", self._init_pop_generator.attempt_cnt)
+            self._metrics.count("init_pop_rejections", self._init_pop_generator.rejected_cnt)
         return pop
 
     def _get_mutation_prevented(self, population):
         elite = self._mutation_preventer(population)
-        self._list_of_types_check("mutation_preventer", elite, Gene)
+        self._population_check("mutation_preventer", elite)
         return elite
 
     def _select_parents_for_next_generation(self, population):
         next_gen = self._parent_selector(population)
-        self._list_of_types_check("selector", next_gen, Gene)
+        self._population_check("selector", next_gen)
         return next_gen
 
     def _crossover(self, parents, population):
         co = self._crossoverer(parents, population)
-        self._list_of_types_check("crossoverer", co, Gene)
+        self._population_check("crossoverer", co)
         return co
 
+    @staticmethod
+    def _copy_for_mutation(next_generation):
+        return [gene.copy_on_write() for gene in next_generation]
+
     def _mutate(self, next_generation):
-        mutated = deepcopy(next_generation)
-        for mutator in self._mutators:
-            mutated = mutator(mutated)
-            self._list_of_types_check("mutator", mutated, Gene)
+        mutated = self._copy_for_mutation(next_generation)
+        for mutator, phase in zip(self._mutators, self._mutator_phases):
+            with self._metrics.measure(phase):
+                mutated = mutator(mutated)
+            self._population_check("mutator", mutated)
         return mutated
 
+    def _check_budget(self):
+        if not self._generating_init_pop and self._terminator.is_exhausted():
+            raise BudgetExhaustedException
+
+    def _calculate_fitness(self, genes):
+        if self._has_budget:
+            self._check_budget()
+        dirty = lookup_fitness(self._fitness_calculator, [gene for gene in genes if gene.fitness is None])
+        self._evaluation_cnt += len(dirty)
+        for gene, fitness in zip(dirty, self._fitness_evaluator(dirty)):
+            gene.fitness = fitness
+        if self._surrogate is not None:
+            self._surrogate.add(dirty)
+
     def _fitness_and_repair(self, next_generation, population):
-        pop = None
+        pool = None
+        self._calculate_fitness(next_generation)
         for i in range(len(next_generation)):
-            next_generation[i].fitness = self._fitness_calculator(next_generation[i])
             try:
                 next_generation[i] = self._non_solution_handler(next_generation[i])
             except SuddenDeathException:
-                if pop is None:
-                    pop = deepcopy(population)
-                replacement = pop.pop(randint(0, len(pop)-1))
-                next_generation[i] = replacement
+                self._metrics.count("sudden_deaths")
+                # the replacement is drawn by index and shares its data with the original until written to
+                if pool is None:
+                    pool = list(range(len(population)))
+                next_generation[i] = population[pool.pop(randint(0, len(pool)-1))].copy_on_write()
         return next_generation
 
+    def _screen(self, next_generation, population_size):
+        # only the offspring the surrogate finds promising are evaluated, the others are discarded,
+        # as long as enough individuals remain for the survivor selection to choose from
+        dirty = [gene for gene in next_generation if gene.fitness is None]
+        min_size = ceil(self._surrogate.min_candidate_ratio * population_size)
+        evaluated = self._surrogate.screen(dirty, len(next_generation) - min_size)
+        if len(evaluated) == len(dirty):
+            return next_generation
+        self._metrics.count("surrogate_saved", len(dirty) - len(evaluated))
+        evaluated = {id(gene) for gene in evaluated}
+        return [gene for gene in next_generation if gene.fitness is not None or id(gene) in evaluated]
+
     def _select_survivors(self, next_generation, population_size):
         survivors = self._survivor_selector(next_generation, count=population_size)
-        self._list_of_types_check("survivor_selector", survivors, Gene)
+        self._population_check("survivor_selector", survivors)
         return survivors
 
+    @staticmethod
+    def _as_population(genes):
+        return genes if isinstance(genes, SortedPopulation) else SortedPopulation(genes)
+
+    @staticmethod
+    def _sort_by_fitness(population):
+        if isinstance(population, SortedPopulation):
+            population.sort_by_fitness()
+        else:
+            population.sort(key=lambda x: -x.fitness)
+
+    @staticmethod
+    def _get_best(population):
+        return max(population, key=lambda x: x.fitness)
+
+    @staticmethod
+    def _increase_age(population):
+        for item in population:
+            item.age += 1
+
     def _terminate(self, population, best, generation_cnt):
         term = self._terminator(population, best, generation_cnt)
         if not isinstance(term, bool):
             raise TypeError("terminator must return a bool, not {}.".format(term.__class__.__name__))
         term = term or self._sigint_handler.SIGINT
         if term:
-            for renderer in self._renderers:
-                renderer.write()
+            self._finish()
         return term
 
+    def _finish(self):
+        for renderer in self._renderers:
+            renderer.write()
+        self._metrics.write()
+
     def _render(self, population, best, generation_cnt):
         for renderer in self._renderers:
             renderer.append(population, best, generation_cnt)
 
-    def run(self):
-        # generate initial population
-        population = self._generate_init_pop()
+    def _immigrate(self, population, migrants):
+        population[len(population) - len(migrants):] = migrants
+        self._sort_by_fitness(population)
+
+    def _take_injected(self, population, best):
+        # the injected individuals are evaluated and repaired like offspring, then replace the least fit ones
+        injected = reduce(add, self._injected[1:], self._injected[0].copy())
+        self._injected = []
+        injected = self._fitness_and_repair(injected, population)
+        self._sort_by_fitness(injected)
+        injected = injected[:len(population)]
+        self._immigrate(population, injected)
+        injected_best = self._get_best(injected)
+        return injected_best if injected_best.fitness > best.fitness else best
+
+    def _get_checkpoint_state(self, population, best, generation_cnt):
+        numpy = sys.modules.get("numpy")
+        return {"population": population,
+                "best": best,
+                "generation_cnt": generation_cnt,
+                "evaluation_cnt": self.get_evaluation_cnt(),
+                "random_state": getstate(),
+                "numpy_random_state": None if numpy is None else numpy.random.get_state(),
+                "terminator_state": self._terminator.get_state() if hasattr(self._terminator, "get_state") else None}
+
+    def _restore_checkpoint_state(self, state):
+        setstate(state["random_state"])
+        if state["numpy_random_state"] is not None:
+            import numpy
+            numpy.random.set_state(state["numpy_random_state"])
+        if hasattr(self._terminator, "set_state"):
+            self._terminator.set_state(state["terminator_state"])
+        self._evaluation_cnt += state["evaluation_cnt"] - self.get_evaluation_cnt()
+
+    def _iter_generations(self, state=None):
+        measure = self._metrics.measure
+
+        if hasattr(self._terminator, "start"):
+            self._terminator.start(self)
+
+        if state is None:
+            # generate initial population
+            with measure("init_pop"):
+                population = self._as_population(self._generate_init_pop())
+
+            # find current best
+            with measure("sorting"):
+                self._sort_by_fitness(population)
+            best = self._get_best(population)
+
+            generation_cnt = 0
+
+            # render initial state
+            with measure("rendering"):
+                self._render(population, best, generation_cnt)
+            self._metrics.emit(generation_cnt, self.get_evaluation_cnt())
+            yield population, best, generation_cnt
+        else:
+            # continue from a checkpoint
+            population, best, generation_cnt = state["population"], state["best"], state["generation_cnt"]
+            population = self._as_population(population)
         population_size = len(population)
-
-        # find current best
-        population.sort(key=lambda x: -x.fitness)
-        best = population[0]
-
-        generation_cnt = 0
-
-        # render initial state
-        self._render(population, best, generation_cnt)
+        if self._surrogate is not None:
+            self._surrogate.add(population)
 
         while True:
+            # let the individuals injected since the last generation in
+            if self._injected:
+                with measure("fitness_and_repair"):
+                    best = self._take_injected(population, best)
+
             # strip the elite off of the population
-            elite = self._get_mutation_prevented(population)
+            with measure("mutation_preventer"):
+                elite = self._get_mutation_prevented(population)
 
             # select parents for the next generation
-            parents = self._select_parents_for_next_generation(elite + population)
+            with measure("parent_selection"):
+                parents = self._select_parents_for_next_generation(elite + population)
 
             # crossover the parents to create offspring
-            offspring = self._crossover(parents, elite + population)
+            with measure("crossover"):
+                offspring = self._crossover(parents, elite + population)
 
             # mutate the next generation candidates
             mutated_offspring = self._mutate(offspring)
@@ -169,16 +382,24 @@ class GeneticSolver:
 
             next_generation = elite + next_generation_candidates
 
-            next_generation = self._fitness_and_repair(next_generation, population)
+            if self._surrogate is not None:
+                with measure("surrogate"):
+                    next_generation = self._screen(next_generation, population_size)
+
+            with measure("fitness_and_repair"):
+                next_generation = self._fitness_and_repair(next_generation, population)
 
             # check for a new best
-            this_gen_best = max(next_generation, key=lambda x: x.fitness)
+            with measure("sorting"):
+                this_gen_best = self._get_best(next_generation)
             if this_gen_best.fitness > best.fitness:
                 best = this_gen_best
 
             # select survivors
-            next_generation = self._select_survivors(next_generation, population_size)
-            next_generation.sort(key=lambda x: -x.fitness)
+            with measure("survivor_selection"):
+                next_generation = self._as_population(self._select_survivors(next_generation, population_size))
+            with measure("sorting"):
+                self._sort_by_fitness(next_generation)
 
             # check if the sizes of generations match
             if len(next_generation) != population_size:
@@ -188,12 +409,84 @@ class GeneticSolver:
             # advance to the next generation
             generation_cnt += 1
             population = next_generation
-            for item in population:
-                item.age += 1
+            self._increase_age(population)
 
             # render current state
-            self._render(population, best, generation_cnt)
+            with measure("rendering"):
+                self._render(population, best, generation_cnt)
+            self._metrics.emit(generation_cnt, self.get_evaluation_cnt())
+            yield population, best, generation_cnt
+
+    def _save_checkpoint(self, population, best, generation_cnt, wait):
+        with self._metrics.measure("checkpoint"):
+            self._checkpointer.save(self._get_checkpoint_state(population, best, generation_cnt), wait=wait)
+
+    def _iter_snapshots(self, generations):
+        best = None
+        try:
+            for population, best, generation_cnt in generations:
+                # check if the algorithm terminates
+                terminate = False
+                if generation_cnt > 0:
+                    with self._metrics.measure("termination"):
+                        terminate = self._terminate(population, best, generation_cnt)
+                    if self._checkpointer is not None and (terminate or self._checkpointer.is_due(generation_cnt)):
+                        self._save_checkpoint(population, best, generation_cnt, terminate)
+                if terminate:
+                    break
+                yield GenerationSnapshot(population, best, generation_cnt, self.get_evaluation_cnt(), False)
+                if self._stop_requested:
+                    # stopped between generations, the run ends with the last one
+                    self._stop_requested = False
+                    if self._checkpointer is not None:
+                        self._save_checkpoint(population, best, generation_cnt, True)
+                    self._finish()
+                    break
+        except BudgetExhaustedException:
+            # the budget ran out within a generation, the run ends with the last complete one
+            if best is None:
+                raise
+            self._finish()
+        yield GenerationSnapshot(population, best, generation_cnt, self.get_evaluation_cnt(), True)
+
+    def _handling_sigint(self):
+        return handling_sigint(self._sigint_handler, self.handle_sigint)
+
+    def _run(self, generations):
+        with self._handling_sigint():
+            for snapshot in self._iter_snapshots(generations):
+                pass
+        return snapshot.best
 
-            # check if the algorithm terminates
-            if self._terminate(population, best, generation_cnt):
-                return best
+    def run(self):
+        self._stop_requested = False
+        return self._run(self._iter_generations())
+
+    def resume(self, path=None):
+        if path is None:
+            if self._checkpointer is None:
+                raise ValueError("resume needs a path when the solver has no checkpointer.")
+            path = self._checkpointer.path
+        state = Checkpointer.load(path)
+        self._restore_checkpoint_state(state)
+        self._stop_requested = False
+        return self._run(self._iter_generations(state))
+
+    def iter_generations(self):
+        # the run as a generator, the caller decides when to advance it
+        self._stop_requested = False
+        return self._iter_snapshots(self._iter_generations())
+
+    def step(self):
+        if self._snapshots is None:
+            # unlike iter_generations(), a stop() before the first step is kept
+            self._snapshots = self._iter_snapshots(self._iter_generations())
+        return next(self._snapshots, None)
+
+    def inject(self, genes):
+        self._check_population("inject", genes)
+        if len(genes) > 0:
+            self._injected.append(genes)
+
+    def stop(self):
+        self._stop_requested = True
@@ -1,18 +1,64 @@
+def evaluate_batch(fitness_calculator, genes):
+    if hasattr(fitness_calculator, "evaluate_batch"):
+        return fitness_calculator.evaluate_batch(genes)
+    return [fitness_calculator(gene) for gene in genes]
+
+
+def lookup_fitness(fitness_calculator, genes):
+    # fills in the fitness the calculator already knows without computing it, returns the other genes
+    if not hasattr(fitness_calculator, "lookup_batch"):
+        return genes
+    missing = []
+    for gene, fitness in zip(genes, fitness_calculator.lookup_batch(genes)):
+        if fitness is None:
+            missing.append(gene)
+        else:
+            gene.fitness = fitness
+    return missing
+
+
+class BudgetExhaustedException(Exception):
+    pass
+
+
 class InitPopGenerator:
+    evaluation_cnt = 0
+
+    def set_fitness_evaluator(self, fe):
+        pass
+
     def __call__(self):
         raise NotImplementedError
 
 
 class Mutator:
+    evaluation_cnt = 0
+    budget_check = None
+
     def __init__(self):
         self.fitness_calculator = None
 
     def set_fitness_calculator(self, fc):
         self.fitness_calculator = fc
 
+    def set_budget_check(self, budget_check):
+        self.budget_check = budget_check
+
+    def check_budget(self):
+        # raises BudgetExhaustedException once the solver's time or evaluation budget is spent
+        if self.budget_check is not None:
+            self.budget_check()
+
     def calculate_fitness(self, gene):
-        gene.fitness = self.fitness_calculator(gene)
-        return gene.fitness
+        return self.calculate_fitness_batch([gene])[0]
+
+    def calculate_fitness_batch(self, genes):
+        self.check_budget()
+        self.evaluation_cnt += len(genes)
+        fitnesses = evaluate_batch(self.fitness_calculator, genes)
+        for gene, fitness in zip(genes, fitnesses):
+            gene.fitness = fitness
+        return fitnesses
 
     def __call__(self, population):
         raise NotImplementedError
@@ -23,6 +69,47 @@ class FitnessCalculator:
         raise NotImplementedError
 
 
+class BatchFitnessCalculator(FitnessCalculator):
+    def __call__(self, gene):
+        return self.evaluate_batch([gene])[0]
+
+    def evaluate_batch(self, genes):
+        raise NotImplementedError
+
+
+class IncrementalFitnessCalculator(FitnessCalculator):
+    def __call__(self, gene):
+        return self.get_fitness(self.get_state(gene))
+
+    def get_state(self, gene):
+        raise NotImplementedError
+
+    def get_fitness(self, state):
+        raise NotImplementedError
+
+    def update_state(self, state, gene, index, value):
+        raise NotImplementedError
+
+
+class FitnessEvaluator:
+    def __init__(self):
+        self.fitness_calculator = None
+
+    def set_fitness_calculator(self, fc):
+        self.fitness_calculator = fc
+
+    def __call__(self, genes):
+        raise NotImplementedError
+
+
+class Surrogate:
+    def fit(self, x, y):
+        raise NotImplementedError
+
+    def predict(self, x):
+        raise NotImplementedError
+
+
 class Crossoverer:
     def __call__(self, parents, population):
         raise NotImplementedError
@@ -44,15 +131,33 @@ class MutationPreventer:
 
 
 class NonSolutionHandler:
+    evaluation_cnt = 0
+    budget_check = None
+
     def __init__(self):
         self.fitness_calculator = None
 
     def set_fitness_calculator(self, fc):
         self.fitness_calculator = fc
 
+    def set_budget_check(self, budget_check):
+        self.budget_check = budget_check
+
+    def check_budget(self):
+        # raises BudgetExhaustedException once the solver's time or evaluation budget is spent
+        if self.budget_check is not None:
+            self.budget_check()
+
     def calculate_fitness(self, gene):
-        gene.fitness = self.fitness_calculator(gene)
-        return gene.fitness
+        return self.calculate_fitness_batch([gene])[0]
+
+    def calculate_fitness_batch(self, genes):
+        self.check_budget()
+        self.evaluation_cnt += len(genes)
+        fitnesses = evaluate_batch(self.fitness_calculator, genes)
+        for gene, fitness in zip(genes, fitnesses):
+            gene.fitness = fitness
+        return fitnesses
 
     def __call__(self, gene):
         raise NotImplementedError
@@ -64,3 +169,16 @@ class Renderer:
 
     def write(self):
         raise NotImplementedError
+
+
+class Topology:
+    def __call__(self, island_cnt):
+        raise NotImplementedError
+
+
+class MetricsSink:
+    def append(self, record):
+        raise NotImplementedError
+
+    def write(self):
+        raise NotImplementedError
@@ -0,0 +1,150 @@
+import sys
+from functools import reduce
+from multiprocessing import Pipe, Process
+from operator import add
+from random import randint, sample
+from signal import signal, SIGINT
+
+from .genetic import SIGINT_handler, handling_sigint
+from .interfaces import Topology, BudgetExhaustedException
+
+
+class RingTopology(Topology):
+    def __call__(self, island_cnt):
+        return [[(i + 1) % island_cnt] for i in range(island_cnt)]
+
+
+class FullyConnectedTopology(Topology):
+    def __call__(self, island_cnt):
+        return [[j for j in range(island_cnt) if j != i] for i in range(island_cnt)]
+
+
+class RandomTopology(Topology):
+    def __init__(self, destination_cnt_fn=lambda: 1):
+        self.destination_cnt_fn = destination_cnt_fn
+
+    def get_destination_cnt(self):
+        return self.destination_cnt_fn()
+
+    def __call__(self, island_cnt):
+        return [sample([j for j in range(island_cnt) if j != i], min(self.get_destination_cnt(), island_cnt - 1))
+                for i in range(island_cnt)]
+
+
+def _run_island(solver_factory, seed, migration_interval, migrant_cnt, handle_sigint, connection):
+    try:
+        random = sys.modules["random"]
+        random.seed(seed)
+        numpy = sys.modules.get("numpy")
+        if numpy is not None:
+            numpy.random.seed(seed)
+
+        solver = solver_factory()
+        if handle_sigint:
+            # an interrupted island terminates like its solver would, so that it still reports its best
+            signal(SIGINT, solver._sigint_handler.signal_handler)
+        best = None
+        try:
+            for population, best, generation_cnt in solver._iter_generations():
+                if generation_cnt == 0:
+                    continue
+                terminate = solver._terminate(population, best, generation_cnt)
+                if terminate or generation_cnt % migration_interval == 0:
+                    connection.send((best, population[:migrant_cnt], terminate))
+                    if terminate:
+                        return
+                    batches = connection.recv()
+                    if batches:
+                        migrants = reduce(add, batches)
+                        solver._sort_by_fitness(migrants)
+                        solver._immigrate(population, migrants[:migrant_cnt])
+        except BudgetExhaustedException:
+            # the budget ran out within a generation, the island ends with its last complete one
+            if best is None:
+                raise
+            solver._finish()
+            connection.send((best, population[:migrant_cnt], True))
+    except Exception as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+class IslandModel:
+    def __init__(self, solver_factory, island_cnt, migration_interval, migrant_cnt, topology=None, seeds=None,
+                 handle_sigint=False):
+        if migration_interval < 1:
+            raise ValueError("migration_interval must be at least 1.")
+        if seeds is not None and len(seeds) != island_cnt:
+            raise ValueError("seeds must contain one seed per island, {} given for {} islands.".format(
+                len(seeds), island_cnt))
+        self.solver_factory = solver_factory
+        self.island_cnt = island_cnt
+        self.migration_interval = migration_interval
+        self.migrant_cnt = migrant_cnt
+        self.topology = topology or RingTopology()
+        self.seeds = seeds
+        self.island_bests = [None] * island_cnt
+        self.handle_sigint = handle_sigint
+        self._sigint_handler = SIGINT_handler()
+
+    def _start_islands(self):
+        seeds = self.seeds or [randint(0, 2**32 - 1) for _ in range(self.island_cnt)]
+        connections = []
+        processes = []
+        for seed in seeds:
+            connection, island_connection = Pipe()
+            process = Process(target=_run_island, args=(self.solver_factory, seed, self.migration_interval,
+                                                        self.migrant_cnt, self.handle_sigint, island_connection))
+            process.start()
+            island_connection.close()
+            connections.append(connection)
+            processes.append(process)
+        return connections, processes
+
+    def _migrate(self, connections, outgoing):
+        destinations = self.topology(self.island_cnt)
+        incoming = {i: [] for i in outgoing}
+        for source, migrants in outgoing.items():
+            for destination in destinations[source]:
+                if destination != source and destination in incoming:
+                    incoming[destination].append(migrants)
+        for i, batches in incoming.items():
+            connections[i].send(batches)
+
+    def run(self):
+        # on SIGINT, the islands terminate after their current generation, while the main process ignores it
+        # and keeps collecting their results
+        with handling_sigint(self._sigint_handler, self.handle_sigint):
+            return self._run()
+
+    def _run(self):
+        connections, processes = self._start_islands()
+        active = set(range(self.island_cnt))
+        best = None
+
+        try:
+            while active:
+                outgoing = {}
+                for i in sorted(active):
+                    message = connections[i].recv()
+                    if isinstance(message, Exception):
+                        raise message
+                    island_best, migrants, terminated = message
+                    self.island_bests[i] = island_best
+                    if best is None or island_best.fitness > best.fitness:
+                        best = island_best
+                    if terminated:
+                        active.discard(i)
+                    else:
+                        outgoing[i] = migrants
+                self._migrate(connections, outgoing)
+        finally:
+            for process in processes:
+                if active:
+                    process.terminate()
+                process.join()
+            for connection in connections:
+                connection.close()
+
+        return best
@@ -0,0 +1,110 @@
+import json
+from contextlib import nullcontext
+from time import perf_counter
+
+from .interfaces import MetricsSink
+
+
+class _Phase:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.add_time(self.name, perf_counter() - self.start)
+
+
+class NullMetrics:
+    enabled = False
+    _phase = nullcontext()
+
+    def measure(self, name):
+        return self._phase
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def emit(self, generation_cnt, evaluation_cnt):
+        pass
+
+    def write(self):
+        pass
+
+
+class Metrics(NullMetrics):
+    enabled = True
+    counter_names = ("sudden_deaths",)
+
+    def __init__(self, sink):
+        if not isinstance(sink, MetricsSink):
+            raise TypeError("metrics_sink must be a MetricsSink, not {}.".format(sink.__class__.__name__))
+        self.sink = sink
+        self._evaluation_cnt = 0
+        self._phases = {}
+        self._counters = {}
+        self._reset()
+
+    def _reset(self):
+        self._phases = {}
+        self._counters = {name: 0 for name in self.counter_names}
+
+    def measure(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = {"time": 0.0, "calls": 0}
+        phase["time"] += seconds
+        phase["calls"] += 1
+
+    def count(self, name, value=1):
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def emit(self, generation_cnt, evaluation_cnt):
+        record = {"generation": generation_cnt,
+                  "phases": self._phases,
+                  "evaluations": evaluation_cnt - self._evaluation_cnt}
+        record.update(self._counters)
+        self._evaluation_cnt = evaluation_cnt
+        self._reset()
+        self.sink.append(record)
+
+    def write(self):
+        self.sink.write()
+
+
+class InMemoryMetricsSink(MetricsSink):
+    def __init__(self):
+        self.records = []
+
+    def append(self, record):
+        self.records.append(record)
+
+    def write(self):
+        pass
+
+
+class JsonLinesMetricsSink(MetricsSink):
+    def __init__(self, file):
+        self.file = file
+        self._f = open(self.file, "w")
+
+    def __del__(self):
+        self._f.close()
+
+    def append(self, record):
+        self._f.write(json.dumps(record) + "\n")
+
+    def write(self):
+        self._f.flush()
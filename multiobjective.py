@@ -0,0 +1,293 @@
+from bisect import bisect_right
+from random import sample
+
+import numpy as np
+
+from .genetic import GeneticSolver
+from .interfaces import Selector
+from .population import SortedPopulation
+from .renderers import WolframPlotRenderer
+from .selectors import CountSelector
+
+
+def dominates(a, b):
+    # all objectives are maximized
+    return all(x >= y for x, y in zip(a, b)) and a != b
+
+
+def _sort_two_objectives(values):
+    # sweeps the points by descending first objective; each point joins the first front whose last point
+    # does not dominate it, found by binary search, as the second objective of the last points of the fronts
+    # decreases from front to front: O(N log N)
+    fronts = []
+    negated_last = []
+    previous = previous_front = None
+    for i in sorted(range(len(values)), key=lambda x: (-values[x][0], -values[x][1])):
+        value = values[i]
+        if previous is not None and value == values[previous]:
+            # equal points do not dominate each other
+            front = previous_front
+        else:
+            front = bisect_right(negated_last, -value[1])
+        if front == len(fronts):
+            fronts.append([])
+            negated_last.append(-value[1])
+        else:
+            negated_last[front] = -value[1]
+        fronts[front].append(i)
+        previous, previous_front = i, front
+    return fronts
+
+
+def _get_dominance_matrix(values):
+    # dominance[i, j] tells whether i dominates j, i.e. is at least as good in all objectives and not equal
+    at_least = np.ones((len(values), len(values)), dtype=bool)
+    equal = np.ones((len(values), len(values)), dtype=bool)
+    for column in values.T:
+        at_least &= column[:, None] >= column[None, :]
+        equal &= column[:, None] == column[None, :]
+    return at_least & ~equal
+
+
+def _sort_many_objectives(values):
+    # the fast non-dominated sort of NSGA-II, with the O(MN^2) comparisons done by numpy
+    dominance = _get_dominance_matrix(np.asarray(values, dtype=float))
+    dominated_cnt = dominance.sum(axis=0)
+    fronts = []
+    front = np.flatnonzero(dominated_cnt == 0)
+    while len(front):
+        fronts.append(front.tolist())
+        dominated_cnt[front] = -1
+        dominated_cnt -= dominance[front].sum(axis=0)
+        front = np.flatnonzero(dominated_cnt == 0)
+    return fronts
+
+
+def non_dominated_sort(values):
+    # the indices of the fitness vectors, split into fronts of mutually non-dominated ones, the best first
+    if not values:
+        return []
+    if len(values[0]) == 2:
+        return _sort_two_objectives(values)
+    return _sort_many_objectives(values)
+
+
+def get_crowding_distances(values, front):
+    # the crowding distance of each index of the front: the sum over the objectives of the normalized distance
+    # between its neighbours; the extremes get an infinite distance, so that they are kept
+    distances = [0.0] * len(front)
+    if len(front) <= 2:
+        return [float("inf")] * len(front)
+    for m in range(len(values[front[0]])):
+        order = sorted(range(len(front)), key=lambda x: values[front[x]][m])
+        low, high = values[front[order[0]]][m], values[front[order[-1]]][m]
+        distances[order[0]] = distances[order[-1]] = float("inf")
+        if high == low:
+            continue
+        for previous, current, following in zip(order, order[1:], order[2:]):
+            distances[current] += (values[front[following]][m] - values[front[previous]][m]) / (high - low)
+    return distances
+
+
+def get_crowded_order(genes):
+    # the indices of the genes by ascending front, within a front by descending crowding distance
+    values = [gene.fitness for gene in genes]
+    order = []
+    ranks = [0] * len(genes)
+    crowding_distances = [0.0] * len(genes)
+    for rank, front in enumerate(non_dominated_sort(values)):
+        for i, distance in zip(front, get_crowding_distances(values, front)):
+            ranks[i] = rank
+            crowding_distances[i] = distance
+        order.extend(sorted(front, key=lambda x: -crowding_distances[x]))
+    return order, ranks, crowding_distances
+
+
+class ParetoPopulation(SortedPopulation):
+    # a SortedPopulation of genes with vector fitness, ordered by front and crowding distance instead
+    def _invalidate(self):
+        super()._invalidate()
+        self._ranking = None
+
+    def _get_ranking(self):
+        if self._ranking is None:
+            self._ranking = get_crowded_order(self)
+        return self._ranking
+
+    def sort_by_fitness(self):
+        order, ranks, crowding_distances = self._get_ranking()
+        list.__setitem__(self, slice(None), [self[i] for i in order])
+        self._sorted = True
+        self._invalidate()
+        self._ranking = list(range(len(order))), [ranks[i] for i in order], [crowding_distances[i] for i in order]
+
+    def get_ranks(self):
+        return self._get_ranking()[1]
+
+    def get_crowding_distances(self):
+        return self._get_ranking()[2]
+
+    def get_fronts(self):
+        order, ranks, _ = self._get_ranking()
+        fronts = []
+        for i in order:
+            if ranks[i] == len(fronts):
+                fronts.append([])
+            fronts[ranks[i]].append(self[i])
+        return fronts
+
+    def get_fitness_values(self):
+        # the fitness of the individuals, the best first
+        if self._values is None:
+            self._values = [self[i].fitness for i in self._get_ranking()[0]]
+        return self._values
+
+    def get_ascending_order(self):
+        if self._ascending_order is None:
+            self._ascending_order = self._get_ranking()[0][::-1]
+        return self._ascending_order
+
+    def count_above(self, fitness):
+        # the number of individuals which dominate the fitness
+        return sum(dominates(gene.fitness, fitness) for gene in self)
+
+    def get_stats(self):
+        # the statistics of each objective, as tuples
+        if self._stats is None:
+            objectives = [sorted(values, reverse=True) for values in zip(*(gene.fitness for gene in self))]
+            ranks = self.get_ranks()
+            self._stats = {"min": tuple(values[-1] for values in objectives),
+                           "max": tuple(values[0] for values in objectives),
+                           "median": tuple(values[len(values) // 2] for values in objectives),
+                           "mean": tuple(sum(values) / len(values) for values in objectives),
+                           "distinct_cnt": len({tuple(gene.fitness) for gene in self}),
+                           "front_cnt": max(ranks) + 1,
+                           "first_front_size": ranks.count(0)}
+        return self._stats
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            is_sorted = self._sorted and (item.step or 1) > 0
+            population = ParetoPopulation(list.__getitem__(self, item), is_sorted)
+            if is_sorted and self._ranking is not None:
+                # the slice keeps the ranks and crowding distances of the whole population, like the selection
+                # of NSGA-II does
+                _, ranks, crowding_distances = self._ranking
+                population._ranking = list(range(len(population))), ranks[item], crowding_distances[item]
+            return population
+        return list.__getitem__(self, item)
+
+    def __add__(self, other):
+        return ParetoPopulation(list.__add__(self, other))
+
+    def __radd__(self, other):
+        return ParetoPopulation(list(other) + list(self))
+
+
+class NonDominatedSelector(Selector):
+    def __init__(self, count_fn=None):
+        self.count_fn = count_fn
+
+    def get_count(self):
+        return self.count_fn()
+
+    def __call__(self, population, count=None):
+        # whole fronts are selected as long as they fit, the rest of the next front by crowding distance
+        count = count or self.get_count()
+        if not isinstance(population, ParetoPopulation) or not population.is_sorted():
+            population = ParetoPopulation(population)
+            population.sort_by_fitness()
+        return population[:count]
+
+
+class CrowdedTournamentSelector(CountSelector):
+    def __init__(self, tournament_size_fn, elitism_fn, count_fn=None):
+        super().__init__(elitism_fn, count_fn)
+        self.tournament_size_fn = tournament_size_fn
+
+    def get_tournament_size(self):
+        return self.tournament_size_fn()
+
+    def choose_parent_id(self, population):
+        # the pool is ordered by front and crowding distance, the best last
+        return max(sample(range(len(population)), self.get_tournament_size()))
+
+
+class ParetoArchive:
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._front = []
+
+    def __len__(self):
+        return len(self._front)
+
+    def __iter__(self):
+        return iter(self._front)
+
+    def get_front(self):
+        # the non-dominated genes, by descending fitness
+        return sorted(self._front, key=lambda x: tuple(x.fitness), reverse=True)
+
+    def clear(self):
+        self._front = []
+
+    def add(self, genes):
+        # the genes join the front unless they are dominated; the members they dominate leave it
+        seen = {tuple(gene.fitness) for gene in self._front}
+        candidates = list(self._front)
+        for gene in genes:
+            key = tuple(gene.fitness)
+            if key not in seen:
+                seen.add(key)
+                candidates.append(gene)
+        if len(candidates) == len(self._front):
+            return
+        values = [gene.fitness for gene in candidates]
+        front = non_dominated_sort(values)[0]
+        if self.max_size is not None and len(front) > self.max_size:
+            # the most crowded ones are left out
+            distances = get_crowding_distances(values, front)
+            front = [i for _, i in sorted(zip(distances, front), key=lambda x: -x[0])[:self.max_size]]
+        self._front = [candidates[i] for i in sorted(front)]
+
+
+class MultiObjectiveSolver(GeneticSolver):
+    supports_surrogates = False
+
+    def __init__(self, *args, archive=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for renderer in self._renderers:
+            if isinstance(renderer, WolframPlotRenderer):
+                raise TypeError("MultiObjectiveSolver does not support WolframPlotRenderer.")
+        self.archive = ParetoArchive() if archive is None else archive
+
+    def _generate_init_pop(self):
+        population = super()._generate_init_pop()
+        self.archive.add(population)
+        return population
+
+    def _fitness_and_repair(self, next_generation, population):
+        next_generation = super()._fitness_and_repair(next_generation, population)
+        self.archive.add(next_generation)
+        return next_generation
+
+    @staticmethod
+    def _as_population(genes):
+        return genes if isinstance(genes, ParetoPopulation) else ParetoPopulation(genes)
+
+    @staticmethod
+    def _sort_by_fitness(population):
+        if isinstance(population, ParetoPopulation):
+            population.sort_by_fitness()
+        else:
+            population[:] = [population[i] for i in get_crowded_order(population)[0]]
+
+    def _get_checkpoint_state(self, population, best, generation_cnt):
+        state = super()._get_checkpoint_state(population, best, generation_cnt)
+        state["archive"] = list(self.archive)
+        return state
+
+    def _restore_checkpoint_state(self, state):
+        super()._restore_checkpoint_state(state)
+        self.archive.clear()
+        self.archive.add(state["archive"])
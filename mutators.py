@@ -1,8 +1,24 @@
-from random import sample, random, shuffle
+from math import log
+from random import choice, random, shuffle
 
 from .interfaces import Mutator
 
 
+def get_mutated_loci(length, probability):
+    # the gaps between the mutated loci are geometrically distributed, which selects each locus
+    # independently with the given probability while drawing a random number per mutation only
+    if probability <= 0:
+        return
+    if probability >= 1:
+        yield from range(length)
+        return
+    log_q = log(1 - probability)
+    i = int(log(1 - random()) / log_q)
+    while i < length:
+        yield i
+        i += 1 + int(log(1 - random()) / log_q)
+
+
 class ProbabilityMutator(Mutator):
     def __init__(self, mutation_probability_fn):
         super().__init__()
@@ -16,15 +32,25 @@ class ProbabilityMutator(Mutator):
 
 
 class RandomResettingMutator(ProbabilityMutator):
-    def __init__(self, allowed_values, mutation_probability_fn):
+    def __init__(self, allowed_values, mutation_probability_fn, skip_sampling=False):
         self.allowed_values = allowed_values
+        self.skip_sampling = skip_sampling
+        self._replacements = {value: self.get_replacements(value) for value in allowed_values}
         super().__init__(mutation_probability_fn)
 
+    def get_replacements(self, not_this):
+        return tuple(self.allowed_values.difference({not_this}))
+
     def get_random_replacement(self, not_this):
-        return sample(self.allowed_values.difference({not_this}), 1)[0]
+        replacements = self._replacements.get(not_this)
+        return choice(self.get_replacements(not_this) if replacements is None else replacements)
 
     def __call__(self, population):
         for gene in population:
+            if self.skip_sampling:
+                for i in get_mutated_loci(len(gene), self.get_mutation_probability()):
+                    gene[i] = self.get_random_replacement(gene[i])
+                continue
             for i in range(len(gene)):
                 if random() < self.get_mutation_probability():
                     gene[i] = self.get_random_replacement(gene[i])
@@ -32,11 +58,38 @@ class RandomResettingMutator(ProbabilityMutator):
 
 
 class BitFlipMutator(RandomResettingMutator):
-    def __init__(self, mutation_probability_fn):
-        super().__init__({0, 1}, mutation_probability_fn)
+    def __init__(self, mutation_probability_fn, skip_sampling=False):
+        super().__init__({0, 1}, mutation_probability_fn, skip_sampling)
+
+
+class LocalSearchMutator(Mutator):
+    def is_incremental(self):
+        return hasattr(self.fitness_calculator, "update_state")
+
+    def get_fitness_and_state(self, gene):
+        if not self.is_incremental():
+            return self.calculate_fitness(gene), None
+        self.evaluation_cnt += 1
+        state = self.fitness_calculator.get_state(gene)
+        gene.fitness = self.fitness_calculator.get_fitness(state)
+        return gene.fitness, state
+
+    def get_fitness_and_state_after(self, gene, state, index, value):
+        if self.is_incremental():
+            state = self.fitness_calculator.update_state(state, gene, index, value)
+            return self.fitness_calculator.get_fitness(state), state
+        old_value, old_fitness = gene[index], gene.fitness
+        gene[index] = value
+        fitness = self.calculate_fitness(gene)
+        gene[index] = old_value
+        gene.fitness = old_fitness
+        return fitness, None
+
+    def __call__(self, population):
+        raise NotImplementedError
 
 
-class GreedyImprovementBitFlipMutator(Mutator):
+class GreedyImprovementBitFlipMutator(LocalSearchMutator):
     def __init__(self, individual_mutation_probability_fn):
         self.individual_mutation_probability_fn = individual_mutation_probability_fn
         super().__init__()
@@ -49,24 +102,18 @@ class GreedyImprovementBitFlipMutator(Mutator):
             if random() > self.individual_mutation_probability_fn():
                 continue
             repeat = True
-            old_fitness = self.calculate_fitness(gene)
+            old_fitness, state = self.get_fitness_and_state(gene)
             while repeat:
                 repeat = False
                 arr = [i for i in range(len(gene))]
                 shuffle(arr)
                 for i in arr:
-                    if gene[i] == 0:
-                        gene[i] = 1
-                    else:
-                        gene[i] = 0
-                    new_fitness = self.calculate_fitness(gene)
-                    if old_fitness >= new_fitness:
-                        gene.fitness = old_fitness
-                        if gene[i] == 0:
-                            gene[i] = 1
-                        else:
-                            gene[i] = 0
-                    else:
-                        old_fitness = new_fitness
+                    self.check_budget()
+                    value = 1 if gene[i] == 0 else 0
+                    new_fitness, new_state = self.get_fitness_and_state_after(gene, state, i, value)
+                    if old_fitness < new_fitness:
+                        gene[i] = value
+                        gene.fitness = old_fitness = new_fitness
+                        state = new_state
                         repeat = True
         return population
@@ -0,0 +1,255 @@
+from array import array
+from itertools import chain
+from random import random, randrange, sample, shuffle
+
+from .crossoverers import TwoParentCrossoverer
+from .gene import Gene
+from .generators import SolutionEnforcingInitPopGenerator
+from .mutators import ProbabilityMutator, get_mutated_loci
+
+
+def _get_typecode(size):
+    # the smallest unsigned type which holds the values 0 to size - 1
+    for typecode in "BHIL":
+        if size <= 1 << (8 * array(typecode).itemsize):
+            return typecode
+    return "Q"
+
+
+def _get_segment(length):
+    # a random non-empty segment [start, end)
+    start, end = sorted(sample(range(length + 1), 2))
+    return start, end
+
+
+def _rebuild_permutation_gene(data, state):
+    gene = PermutationGene(())
+    gene._data = data
+    gene.__dict__.update(state)
+    return gene
+
+
+class PermutationGene(Gene):
+    def __init__(self, values):
+        super().__init__()
+        values = list(values)
+        # the data and the positions are shared with copies until either is written to
+        self._data = array(_get_typecode(len(values)), values)
+        self._shared = False
+        self._positions = None
+
+    def _write(self):
+        if self._shared:
+            self._data = array(self._data.typecode, self._data)
+            self._shared = False
+        self._positions = None
+        self.fitness = None
+
+    def to_array(self):
+        return array(self._data.typecode, self._data)
+
+    def get_positions(self):
+        # the position of each value, so that looking a value up takes O(1) instead of O(L)
+        if self._positions is None:
+            positions = array(self._data.typecode, bytes(len(self._data) * self._data.itemsize))
+            for i, value in enumerate(self._data):
+                positions[value] = i
+            self._positions = positions
+        return self._positions
+
+    def swap(self, i, j):
+        if i != j:
+            self._write()
+            self._data[i], self._data[j] = self._data[j], self._data[i]
+
+    def invert(self, start, end):
+        if end - start > 1:
+            self._write()
+            self._data[start:end] = self._data[end - 1:start - 1 if start else None:-1]
+
+    def scramble(self, start, end):
+        if end - start > 1:
+            self._write()
+            segment = self._data[start:end].tolist()
+            shuffle(segment)
+            self._data[start:end] = array(self._data.typecode, segment)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __contains__(self, item):
+        return item in self._data
+
+    def __getitem__(self, item):
+        if not isinstance(item, int):
+            return self._data[item].tolist()
+        if item >= len(self._data):
+            return self._null_val
+        return self._data[item]
+
+    def __setitem__(self, key, value):
+        if key < 0:
+            key += len(self._data)
+        if not 0 <= key < len(self._data):
+            raise IndexError("PermutationGene has a fixed size.")
+        if self._data[key] != value:
+            self._write()
+            self._data[key] = value
+
+    def _fixed_size(self, *args, **kwargs):
+        raise TypeError("PermutationGene has a fixed size.")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = __delitem__ = __iadd__ = __imul__ = \
+        _fixed_size
+
+    def count(self, item):
+        return self._data.count(item)
+
+    def index(self, item, *args):
+        if not args and self._positions is not None:
+            return self._positions[item]
+        return self._data.index(item, *args)
+
+    def key(self):
+        return self._data.tobytes()
+
+    def __eq__(self, other):
+        if isinstance(other, PermutationGene):
+            return self._data == other._data
+        return list(self._data) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = Gene.__hash__
+
+    def copy(self):
+        self._shared = True
+        gene = PermutationGene(())
+        gene.__dict__.update(self.__dict__)
+        return gene
+
+    def copy_on_write(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce_ex__(self, protocol):
+        state = dict(self.__dict__)
+        del state["_data"]
+        state["_shared"] = False
+        state["_positions"] = None
+        return _rebuild_permutation_gene, (self._data, state)
+
+    def __repr__(self):
+        return "<Fit={}, Age={}, Gene={}>".format(self.fitness, self.age, self._data.tolist())
+
+
+def _from_array(data):
+    gene = PermutationGene(())
+    gene._data = data
+    return gene
+
+
+class PermutationGeneInitPopGenerator(SolutionEnforcingInitPopGenerator):
+    def __init__(self, pop_size, non_solution_handler, gene_size, over_generation=False, max_batch_size=None):
+        super().__init__(pop_size, non_solution_handler, over_generation, max_batch_size)
+        self.gene_size = gene_size
+
+    def generate_gene(self):
+        values = list(range(self.gene_size))
+        shuffle(values)
+        return PermutationGene(values)
+
+
+class OrderCrossoverer(TwoParentCrossoverer):
+    def crossover(self, gene_length, parents):
+        # a segment of the first parent is kept, the rest is filled with the remaining values in the order
+        # of the second parent, both starting after the segment
+        first, second = parents[0]._data, parents[1]._data
+        start, end = _get_segment(gene_length)
+        used = bytearray(gene_length)
+        for value in first[start:end]:
+            used[value] = 1
+        fill = array(first.typecode, [value for value in chain(second[end:], second[:end]) if not used[value]])
+        child = array(first.typecode, first)
+        child[end:] = fill[:gene_length - end]
+        child[:start] = fill[gene_length - end:]
+        return _from_array(child)
+
+
+class PartiallyMappedCrossoverer(TwoParentCrossoverer):
+    def crossover(self, gene_length, parents):
+        # a segment of the first parent replaces that of the second parent, the values it displaces are moved
+        # to where the values of the segment were, following the mapping of the segment
+        first, second = parents[0]._data, parents[1]._data
+        first_positions = parents[0].get_positions()
+        start, end = _get_segment(gene_length)
+        in_segment = bytearray(gene_length)
+        for value in first[start:end]:
+            in_segment[value] = 1
+        child = array(second.typecode, second)
+        child[start:end] = first[start:end]
+        for i in chain(range(start), range(end, gene_length)):
+            value = second[i]
+            while in_segment[value]:
+                value = second[first_positions[value]]
+            child[i] = value
+        return _from_array(child)
+
+
+class CycleCrossoverer(TwoParentCrossoverer):
+    def crossover(self, gene_length, parents):
+        # the positions are split into cycles, which are taken from the parents alternately
+        first, second = parents[0]._data, parents[1]._data
+        first_positions = parents[0].get_positions()
+        child = array(first.typecode, first)
+        visited = bytearray(gene_length)
+        from_second = False
+        for start in range(gene_length):
+            if visited[start]:
+                continue
+            i = start
+            while not visited[i]:
+                visited[i] = 1
+                if from_second:
+                    child[i] = second[i]
+                i = first_positions[second[i]]
+            from_second = not from_second
+        return _from_array(child)
+
+
+class SwapMutator(ProbabilityMutator):
+    def __call__(self, population):
+        for gene in population:
+            for i in get_mutated_loci(len(gene), self.get_mutation_probability()):
+                gene.swap(i, randrange(len(gene)))
+        return population
+
+
+class SegmentMutator(ProbabilityMutator):
+    def mutate_segment(self, gene, start, end):
+        raise NotImplementedError
+
+    def __call__(self, population):
+        for gene in population:
+            if random() < self.get_mutation_probability():
+                self.mutate_segment(gene, *_get_segment(len(gene)))
+        return population
+
+
+class InversionMutator(SegmentMutator):
+    def mutate_segment(self, gene, start, end):
+        gene.invert(start, end)
+
+
+class ScrambleMutator(SegmentMutator):
+    def mutate_segment(self, gene, start, end):
+        gene.scramble(start, end)
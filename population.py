@@ -0,0 +1,136 @@
+from bisect import bisect_left
+
+
+class SortedPopulation(list):
+    # a list of genes which remembers whether it is sorted by fitness, the best first, and caches
+    # statistics of the fitness until it is changed
+    def __init__(self, genes=(), is_sorted=False):
+        super().__init__(genes)
+        self._sorted = is_sorted
+        self._invalidate()
+
+    def _invalidate(self):
+        self._values = None
+        self._negated = None
+        self._ascending_order = None
+        self._stats = None
+
+    def _unsort(self):
+        self._sorted = False
+        self._invalidate()
+
+    def is_sorted(self):
+        return self._sorted
+
+    def sort_by_fitness(self):
+        list.sort(self, key=lambda x: -x.fitness)
+        self._sorted = True
+        self._invalidate()
+
+    def get_fitness_values(self):
+        # the fitness of the individuals, in descending order
+        if self._values is None:
+            self._values = [gene.fitness for gene in self]
+            if not self._sorted:
+                self._values.sort(reverse=True)
+        return self._values
+
+    def get_ascending_order(self):
+        # indices of the individuals by ascending fitness, individuals of equal fitness by ascending index
+        if self._ascending_order is None:
+            if not self._sorted:
+                self._ascending_order = sorted(range(len(self)), key=lambda x: self[x].fitness)
+                return self._ascending_order
+            values = self.get_fitness_values()
+            order = []
+            end = len(values)
+            while end > 0:
+                start = end - 1
+                while start > 0 and values[start - 1] == values[end - 1]:
+                    start -= 1
+                order.extend(range(start, end))
+                end = start
+            self._ascending_order = order
+        return self._ascending_order
+
+    def count_above(self, fitness):
+        if self._negated is None:
+            self._negated = [-value for value in self.get_fitness_values()]
+        return bisect_left(self._negated, -fitness)
+
+    def get_stats(self):
+        if self._stats is None:
+            values = self.get_fitness_values()
+            self._stats = {"min": values[-1],
+                           "max": values[0],
+                           "median": values[len(values) // 2],
+                           "mean": sum(values) / len(values),
+                           "distinct_cnt": 1 + sum(a != b for a, b in zip(values, values[1:]))}
+        return self._stats
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return SortedPopulation(list.__getitem__(self, item), self._sorted and (item.step or 1) > 0)
+        return list.__getitem__(self, item)
+
+    def __add__(self, other):
+        is_sorted = (self._sorted and isinstance(other, SortedPopulation) and other.is_sorted() and
+                     (not self or not other or self[-1].fitness >= other[0].fitness))
+        return SortedPopulation(list.__add__(self, other), is_sorted)
+
+    def __radd__(self, other):
+        return SortedPopulation(list(other) + list(self))
+
+    # removing individuals keeps the order, adding or replacing them does not
+
+    def __delitem__(self, key):
+        list.__delitem__(self, key)
+        self._invalidate()
+
+    def pop(self, index=-1):
+        self._invalidate()
+        return list.pop(self, index)
+
+    def remove(self, item):
+        list.remove(self, item)
+        self._invalidate()
+
+    def clear(self):
+        list.clear(self)
+        self._invalidate()
+
+    def __setitem__(self, key, value):
+        list.__setitem__(self, key, value)
+        self._unsort()
+
+    def append(self, item):
+        list.append(self, item)
+        self._unsort()
+
+    def extend(self, items):
+        list.extend(self, items)
+        self._unsort()
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self._unsort()
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._unsort()
+
+    def reverse(self):
+        list.reverse(self)
+        self._unsort()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, other):
+        list.__imul__(self, other)
+        self._unsort()
+        return self
+
+    def copy(self):
+        return self[:]
@@ -1,10 +1,44 @@
+import json
+
 from .interfaces import Renderer
 
 
+def get_stats(population, best, generation_cnt):
+    if hasattr(population, "get_stats"):
+        stats = population.get_stats()
+        return {"generation": generation_cnt,
+                "min": stats["min"],
+                "max": stats["max"],
+                "med": stats["median"],
+                "best": best.fitness}
+    # the population is sorted by fitness, the best first
+    return {"generation": generation_cnt,
+            "min": population[-1].fitness,
+            "max": population[0].fitness,
+            "med": population[len(population) // 2].fitness,
+            "best": best.fitness}
+
+
+def to_json_value(value):
+    # numpy scalars, e.g. the fitness returned by a batch fitness calculator, are written as Python numbers
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(value.__class__.__name__))
+
+
+def format_individual(individual, show_gene=False):
+    if show_gene:
+        return repr(individual)
+    return "<Fit={}, Age={}>".format(individual.fitness, individual.age)
+
+
 class FileRenderer(Renderer):
     class _Print:
         def write(self, s):
-            print(s)
+            print(s, end="")
+
+        def flush(self):
+            pass
 
     def __init__(self, file):
         self.file = file
@@ -26,61 +60,110 @@ class FileRenderer(Renderer):
         raise NotImplementedError
 
 
-class WolframPlotRenderer(FileRenderer):
-    def __init__(self, file=None):
+class StreamingRenderer(FileRenderer):
+    def __init__(self, file=None, flush_interval=100, decimation=1):
         super().__init__(file)
-        self.min = []
-        self.max = []
-        self.med = []
-
-    def append(self, population, best, generation_cnt):
-        self.min.append([generation_cnt, population[-1].fitness])
-        self.max.append([generation_cnt, population[0].fitness])
-        self.med.append([generation_cnt, population[len(population)//2].fitness])
+        self.flush_interval = flush_interval
+        self.decimation = decimation
+        self._rows = []
+        self._row_cnt = 0
+        self._last_row = None
 
-    def write(self):
-        wrt = 'ListLinePlot[{\n'
+    def format_header(self):
+        return ""
 
-        wrt += '{'
-        for i in range(len(self.min)-1):
-            wrt += '{{{}, {}}}, '.format(*self.min[i])
-        wrt += '{{{}, {}}}'.format(*self.min[-1])
-        wrt += '},\n'
+    def format_row(self, row, row_cnt):
+        raise NotImplementedError
 
-        wrt += '{'
-        for i in range(len(self.max) - 1):
-            wrt += '{{{}, {}}}, '.format(*self.max[i])
-        wrt += '{{{}, {}}}'.format(*self.max[-1])
-        wrt += '},\n'
+    def format_footer(self):
+        return ""
 
-        wrt += '{'
-        for i in range(len(self.med) - 1):
-            wrt += '{{{}, {}}}, '.format(*self.med[i])
-        wrt += '{{{}, {}}}'.format(*self.med[-1])
-        wrt += '}'
+    def flush(self):
+        chunks = [self.format_header()] if self._row_cnt == 0 else []
+        for row in self._rows:
+            chunks.append(self.format_row(row, self._row_cnt))
+            self._row_cnt += 1
+        self._rows = []
+        self.get_file_handle().write("".join(chunks))
 
-        wrt += '},\n'
-        wrt += 'AxesLabel->{"Generation", "Fitness"},\n'
-        wrt += 'PlotLegends->{"Min", "Max", "Med"}]\n'
+    def append(self, population, best, generation_cnt):
+        self._last_row = get_stats(population, best, generation_cnt)
+        if generation_cnt % self.decimation == 0:
+            self._rows.append(self._last_row)
+            self._last_row = None
+            if len(self._rows) >= self.flush_interval:
+                self.flush()
 
-        self.get_file_handle().write(wrt)
+    def write(self):
+        # the last generation is always written, even if decimated
+        if self._last_row is not None:
+            self._rows.append(self._last_row)
+            self._last_row = None
+        self.flush()
+        f = self.get_file_handle()
+        f.write(self.format_footer())
+        f.flush()
+
+
+class CsvRenderer(StreamingRenderer):
+    FIELDS = ("generation", "min", "max", "med", "best")
+
+    def format_header(self):
+        # a field holding a tuple, e.g. the fitness of a multi-objective run, gets a column per item
+        if not self._rows:
+            return "{}\n".format(",".join(self.FIELDS))
+        columns = []
+        for field in self.FIELDS:
+            value = self._rows[0][field]
+            if isinstance(value, tuple):
+                columns.extend("{}_{}".format(field, i) for i in range(len(value)))
+            else:
+                columns.append(field)
+        return "{}\n".format(",".join(columns))
+
+    def format_row(self, row, row_cnt):
+        values = []
+        for field in self.FIELDS:
+            values.extend(row[field] if isinstance(row[field], tuple) else (row[field],))
+        return "{}\n".format(",".join(map(str, values)))
+
+
+class JsonLinesRenderer(StreamingRenderer):
+    def format_row(self, row, row_cnt):
+        return "{}\n".format(json.dumps(row, default=to_json_value))
+
+
+class WolframPlotRenderer(StreamingRenderer):
+    @staticmethod
+    def format_number(number):
+        return str(number).replace("e", "*^")
+
+    def format_header(self):
+        return "ListLinePlot[Function[data, {data[[All, {1, 2}]], data[[All, {1, 3}]], data[[All, {1, 4}]]}][{\n"
+
+    def format_row(self, row, row_cnt):
+        return "{}{{{}, {}, {}, {}}}".format(",\n" if row_cnt else "", row["generation"],
+                                             *map(self.format_number, (row["min"], row["max"], row["med"])))
+
+    def format_footer(self):
+        return ('}],\n'
+                'AxesLabel->{"Generation", "Fitness"},\n'
+                'PlotLegends->{"Min", "Max", "Med"}]\n')
 
 
 class StdoutRenderer(Renderer):
+    def __init__(self, show_gene=False):
+        self.show_gene = show_gene
+
     def append(self, population, best, generation_cnt):
-        print("Generation: {}, best: {}".format(generation_cnt, best))
+        print("Generation: {}, best: {}".format(generation_cnt, format_individual(best, self.show_gene)))
 
     def write(self):
         pass
 
 
-class DetailedStdoutRenderer(Renderer):
+class DetailedStdoutRenderer(StdoutRenderer):
     def append(self, population, best, generation_cnt):
-        minimum = population[-1].fitness
-        maximum = population[0].fitness
-        median = population[len(population) // 2].fitness
+        stats = get_stats(population, best, generation_cnt)
         print("Generation: {}, max: {}, min: {}, med: {}, best: {}".format(
-            generation_cnt, maximum, minimum, median, best))
-
-    def write(self):
-        pass
+            generation_cnt, stats["max"], stats["min"], stats["med"], format_individual(best, self.show_gene)))
@@ -1,10 +1,121 @@
-from bisect import bisect_left
 from copy import deepcopy
-from random import sample, randint
+from heapq import heapify, heappop
+from random import sample, randint, random
 
 from .interfaces import Selector
 
 
+class FenwickTree:
+    def __init__(self, values):
+        self._size = len(values)
+        self._top = 1 << (self._size.bit_length() - 1) if self._size else 0
+        self._tree = [0] + list(values)
+        for i in range(1, self._size + 1):
+            j = i + (i & -i)
+            if j <= self._size:
+                self._tree[j] += self._tree[i]
+
+    def __len__(self):
+        return self._size
+
+    def get_total(self):
+        return self.prefix_sum(self._size)
+
+    def add(self, index, delta):
+        i = index + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        s = 0
+        while count > 0:
+            s += self._tree[count]
+            count -= count & -count
+        return s
+
+    def find(self, target, other=None, factor=0):
+        # smallest index whose inclusive prefix sum exceeds target; with other, the sums of
+        # (self - factor * other) are searched instead
+        pos = 0
+        mask = self._top
+        while mask:
+            nxt = pos + mask
+            if nxt <= self._size:
+                value = self._tree[nxt] - factor * other._tree[nxt] if other else self._tree[nxt]
+                if value <= target:
+                    pos = nxt
+                    target -= value
+            mask >>= 1
+        return pos
+
+
+class SelectionPool:
+    def __init__(self, population, order):
+        self._population = population
+        self._order = order
+        self._present = [True] * len(order)
+        self._count = FenwickTree([1] * len(order))
+        self._len = len(order)
+        self._trees = {}
+        self._heaps = {}
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, ordinal):
+        if ordinal < 0:
+            ordinal += self._len
+        if not 0 <= ordinal < self._len:
+            raise IndexError("selection pool index out of range")
+        return self._population[self._order[self.get_position(ordinal)]]
+
+    def __iter__(self):
+        for position, index in enumerate(self._order):
+            if self._present[position]:
+                yield self._population[index]
+
+    def get_position(self, ordinal):
+        return self._count.find(ordinal)
+
+    def get_index(self, ordinal):
+        return self._order[self.get_position(ordinal)]
+
+    def get_ordinal(self, position):
+        return self._count.prefix_sum(position)
+
+    def get_count_tree(self):
+        return self._count
+
+    def get_weight_tree(self, weight_fn):
+        if weight_fn not in self._trees:
+            weights = [weight_fn(self._population[index]) if self._present[position] else 0
+                       for position, index in enumerate(self._order)]
+            self._trees[weight_fn] = (FenwickTree(weights), weights)
+        return self._trees[weight_fn][0]
+
+    def get_min_ordinal(self, key_fn):
+        if key_fn not in self._heaps:
+            heap = [(key_fn(self._population[index]), position)
+                    for position, index in enumerate(self._order) if self._present[position]]
+            heapify(heap)
+            self._heaps[key_fn] = heap
+        heap = self._heaps[key_fn]
+        while not self._present[heap[0][1]]:
+            heappop(heap)
+        return self.get_ordinal(heap[0][1])
+
+    def pop(self, ordinal):
+        position = self.get_position(ordinal)
+        self._present[position] = False
+        self._count.add(position, -1)
+        for tree, weights in self._trees.values():
+            tree.add(position, -weights[position])
+            weights[position] = 0
+        self._len -= 1
+        return self._order[position]
+
+
 class CountSelector(Selector):
     def __init__(self, elitism_fn, count_fn=None):
         self.count_fn = count_fn
@@ -22,6 +133,9 @@ class CountSelector(Selector):
     def choose_parent_id(self, population):
         raise NotImplementedError
 
+    def select(self, pool, count):
+        return [pool.pop(self.choose_parent_id(pool)) for _ in range(count)]
+
     def __call__(self, population, count=None):
         count = count or self.get_count()
         elitism = self.get_elitism()
@@ -30,19 +144,22 @@ class CountSelector(Selector):
         if count > len(population):
             count = len(population)
 
-        pop = deepcopy(population)
-        pop.sort(key=lambda x: x.fitness)
-
-        if elitism != 0:
-            ret = pop[-elitism:]
-            del pop[-elitism:]
+        if hasattr(population, "get_ascending_order"):
+            order = list(population.get_ascending_order())
         else:
-            ret = []
+            order = sorted(range(len(population)), key=lambda x: population[x].fitness)
+        elite_cnt = min(elitism, len(order))
+        ret = order[len(order) - elite_cnt:]
+        pool = SelectionPool(population, order[:len(order) - elite_cnt])
 
-        for _ in range(count - elitism):
-            ret.append(pop.pop(self.choose_parent_id(pop)))
+        ret.extend(self.select(pool, count - elitism))
 
-        return ret
+        seen = set()
+        selected = []
+        for i in ret:
+            selected.append(deepcopy(population[i]) if i in seen else population[i])
+            seen.add(i)
+        return selected
 
 
 class TournamentSelector(CountSelector):
@@ -62,35 +179,66 @@ class AgeSelector(CountSelector):
     def __init__(self, elitism_fn, count_fn=None):
         super().__init__(elitism_fn, count_fn)
 
+    @staticmethod
+    def get_age(individual):
+        return individual.age
+
     def choose_parent_id(self, population):
-        ids = [i for i in range(len(population))]
-        return max(ids, key=lambda x: -population[x].age)
+        return population.get_min_ordinal(self.get_age)
 
 
 class RouletteSelector(CountSelector):
-    def get_cumulative_probs(self, population):
-        cumulative_probs = [0]
-
-        for item in reversed(population):
-            if item.fitness > 0:
-                cumulative_probs.append(cumulative_probs[-1] + item.fitness)
-
-        return cumulative_probs
+    @staticmethod
+    def get_weight(individual):
+        return individual.fitness if individual.fitness > 0 else 0
 
     def choose_parent_id(self, population):
-        cumulative_probs = self.get_cumulative_probs(population)
+        tree = population.get_weight_tree(self.get_weight)
+        total = tree.get_total()
 
-        rnd = randint(cumulative_probs[0], cumulative_probs[-1])
-        i = bisect_left(cumulative_probs, rnd)
-        return len(population) - i
+        rnd = randint(0, total)
+        if total <= 0:
+            return len(population) - 1
+        return population.get_ordinal(tree.find(total - max(rnd, 1)))
 
 
 class RouletteNegativeFitnessSelector(RouletteSelector):
-    def get_cumulative_probs(self, population):
-        cumulative_probs = [0]
-        min_fitness = min(population, key=lambda x: x.fitness).fitness
+    @staticmethod
+    def get_weight(individual):
+        return individual.fitness
 
-        for item in reversed(population):
-            cumulative_probs.append(cumulative_probs[-1] + item.fitness - min_fitness)
-
-        return cumulative_probs
+    def choose_parent_id(self, population):
+        tree = population.get_weight_tree(self.get_weight)
+        counts = population.get_count_tree()
+        min_fitness = population[0].fitness
+        total = tree.get_total() - min_fitness * counts.get_total()
+
+        rnd = randint(0, total)
+        if total <= 0:
+            return len(population) - 1
+        return population.get_ordinal(tree.find(total - max(rnd, 1), counts, min_fitness))
+
+
+class StochasticUniversalSamplingSelector(RouletteSelector):
+    def select(self, pool, count):
+        if count <= 0:
+            return []
+        weights = [self.get_weight(individual) for individual in pool]
+        total = sum(weights)
+        if total <= 0:
+            weights = [1] * len(weights)
+            total = len(weights)
+
+        spacing = total / count
+        pointer = random() * spacing
+        ret = []
+        cumulative = 0
+        for ordinal, weight in enumerate(weights):
+            cumulative += weight
+            while len(ret) < count and pointer < cumulative:
+                ret.append(ordinal)
+                pointer += spacing
+        while len(ret) < count:
+            ret.append(len(weights) - 1)
+
+        return [pool.get_index(ordinal) for ordinal in ret]
@@ -0,0 +1,215 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from inspect import iscoroutinefunction
+
+from .gene import Gene
+from .generators import SuddenDeathException
+from .genetic import GeneticSolver, SIGINT_handler, handling_sigint
+from .interfaces import BatchFitnessCalculator, Renderer, Mutator, BudgetExhaustedException
+
+
+class _LoopFitnessCalculator(BatchFitnessCalculator):
+    # lets the components, which run in a worker thread, evaluate genes on the event loop
+    def __init__(self, solver, loop):
+        self.solver = solver
+        self.loop = loop
+
+    def evaluate_batch(self, genes):
+        return asyncio.run_coroutine_threadsafe(self.solver._evaluate_batch(genes), self.loop).result()
+
+
+class SteadyStateSolver:
+    def __init__(self,
+                 init_pop_generator,
+                 fitness_calculator,
+                 parent_selector,
+                 crossoverer,
+                 non_solution_handler,
+                 terminator,
+                 mutators=(),
+                 renderers=(),
+                 concurrency=8,
+                 executor=None,
+                 handle_sigint=False):
+        for name, param in (("init_pop_generator", init_pop_generator), ("fitness_calculator", fitness_calculator),
+                            ("parent_selector", parent_selector), ("crossoverer", crossoverer),
+                            ("non_solution_handler", non_solution_handler), ("terminator", terminator)):
+            if not hasattr(param, "__call__"):
+                raise TypeError("{} must be callable.".format(name))
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        self._init_pop_generator = init_pop_generator
+        self._fitness_calculator = fitness_calculator
+        self._parent_selector = parent_selector
+        self._crossoverer = crossoverer
+        self._non_solution_handler = non_solution_handler
+        self._terminator = terminator
+        self._renderers = renderers
+        GeneticSolver._list_of_types_check("renderers", self._renderers, Renderer)
+        self._mutators = mutators
+        GeneticSolver._list_of_types_check("mutators", self._mutators, Mutator)
+        self.concurrency = concurrency
+        self.executor = executor
+
+        self._has_budget = hasattr(self._terminator, "is_exhausted")
+        self._generating_init_pop = False
+        if self._has_budget:
+            for component in self._mutators + [self._non_solution_handler]:
+                if hasattr(component, "set_budget_check"):
+                    component.set_budget_check(self._check_budget)
+
+        self._is_async = iscoroutinefunction(fitness_calculator) or \
+            iscoroutinefunction(getattr(fitness_calculator, "__call__", None))
+        self._sigint_handler = SIGINT_handler()
+        self.handle_sigint = handle_sigint
+        self._evaluation_cnt = 0
+        self._loop = None
+        self._semaphore = None
+
+    def get_evaluation_cnt(self):
+        components = [self._init_pop_generator, self._non_solution_handler,
+                      getattr(self._init_pop_generator, "non_solution_handler", None)] + self._mutators
+        unique = {id(component): component for component in components}
+        return self._evaluation_cnt + sum(getattr(component, "evaluation_cnt", 0) for component in unique.values())
+
+    def _check_budget(self):
+        if not self._generating_init_pop and self._terminator.is_exhausted():
+            raise BudgetExhaustedException
+
+    async def _evaluate(self, gene):
+        async with self._semaphore:
+            if self._is_async:
+                return await self._fitness_calculator(gene)
+            return await self._loop.run_in_executor(self.executor, self._fitness_calculator, gene)
+
+    async def _evaluate_batch(self, genes):
+        return await asyncio.gather(*(self._evaluate(gene) for gene in genes))
+
+    async def _score(self, gene):
+        if gene.fitness is None:
+            gene.fitness = await self._evaluate(gene)
+            self._evaluation_cnt += 1
+        return gene
+
+    def _generate_init_pop(self, fitness_calculator):
+        self._init_pop_generator.set_fitness_calculator(fitness_calculator)
+        # the initial population is always generated whole, see GeneticSolver._generate_init_pop
+        self._generating_init_pop = True
+        try:
+            pop = self._init_pop_generator()
+        finally:
+            self._generating_init_pop = False
+        GeneticSolver._list_of_types_check("init_pop_generator", pop, Gene)
+        return GeneticSolver._as_population(pop)
+
+    def _breed(self, population, count):
+        parents = self._parent_selector(population)
+        GeneticSolver._list_of_types_check("selector", parents, Gene)
+        offspring = self._crossoverer(parents, population[:count])
+        GeneticSolver._list_of_types_check("crossoverer", offspring, Gene)
+        mutated = [gene.copy_on_write() for gene in offspring]
+        for mutator in self._mutators:
+            mutated = mutator(mutated)
+            GeneticSolver._list_of_types_check("mutator", mutated, Gene)
+        return mutated
+
+    def _repair(self, genes):
+        repaired = []
+        for gene in genes:
+            try:
+                repaired.append(self._non_solution_handler(gene))
+            except SuddenDeathException:
+                continue
+        GeneticSolver._list_of_types_check("non_solution_handler", repaired, Gene)
+        return repaired
+
+    @staticmethod
+    def _insert(population, gene):
+        # the offspring replaces the worst individual, unless it is even worse
+        if gene.fitness < population[-1].fitness:
+            return False
+        for item in population:
+            item.age += 1
+        population[-1] = gene
+        GeneticSolver._sort_by_fitness(population)
+        return True
+
+    def _terminate(self, population, best, generation_cnt):
+        term = self._terminator(population, best, generation_cnt)
+        if not isinstance(term, bool):
+            raise TypeError("terminator must return a bool, not {}.".format(term.__class__.__name__))
+        term = term or self._sigint_handler.SIGINT
+        if term:
+            for renderer in self._renderers:
+                renderer.write()
+        return term
+
+    def _render(self, population, best, generation_cnt):
+        for renderer in self._renderers:
+            renderer.append(population, best, generation_cnt)
+
+    async def run_async(self):
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        own_executor = self.executor is None and not self._is_async
+        if own_executor:
+            self.executor = ThreadPoolExecutor(self.concurrency)
+        # the components run in a single worker thread, so that they may evaluate genes synchronously
+        worker = ThreadPoolExecutor(1)
+        in_flight = set()
+        best = None
+
+        try:
+            if hasattr(self._terminator, "start"):
+                self._terminator.start(self)
+            fitness_calculator = _LoopFitnessCalculator(self, self._loop)
+            self._non_solution_handler.set_fitness_calculator(fitness_calculator)
+            for mutator in self._mutators:
+                mutator.set_fitness_calculator(fitness_calculator)
+
+            population = await self._loop.run_in_executor(worker, self._generate_init_pop, fitness_calculator)
+            GeneticSolver._sort_by_fitness(population)
+            best = population[0]
+            generation_cnt = 0
+            self._render(population, best, generation_cnt)
+
+            pending = []
+            while True:
+                # offspring are bred a batch of concurrency at a time, so refilling the free slots rarely waits
+                while len(in_flight) < self.concurrency:
+                    if not pending:
+                        pending = await self._loop.run_in_executor(worker, self._breed, population, self.concurrency)
+                    in_flight.add(asyncio.ensure_future(self._score(pending.pop())))
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                scored = [task.result() for task in done]
+                for gene in await self._loop.run_in_executor(worker, self._repair, scored):
+                    if gene.fitness > best.fitness:
+                        best = gene
+                    self._insert(population, gene)
+
+                    # each scored offspring counts as a generation
+                    generation_cnt += 1
+                    self._render(population, best, generation_cnt)
+                    if self._terminate(population, best, generation_cnt):
+                        return best
+        except BudgetExhaustedException:
+            # the budget ran out while breeding or repairing
+            if best is None:
+                raise
+            for renderer in self._renderers:
+                renderer.write()
+            return best
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            worker.shutdown(wait=False)
+            if own_executor:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+    def run(self):
+        with handling_sigint(self._sigint_handler, self.handle_sigint):
+            return asyncio.run(self.run_async())
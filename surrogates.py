@@ -0,0 +1,128 @@
+from collections import deque
+from math import ceil
+from random import sample
+
+import numpy as np
+
+from .interfaces import Surrogate
+
+
+class KNearestNeighborsSurrogate(Surrogate):
+    def __init__(self, k=5):
+        self.k = k
+        self._x = None
+        self._y = None
+        self._norms = None
+
+    def fit(self, x, y):
+        self._x = x
+        self._y = y
+        self._norms = np.einsum("ij,ij->i", x, x)
+
+    def predict(self, x):
+        # squared euclidean distances to all the training genes, the mean fitness of the k nearest is predicted
+        distances = np.einsum("ij,ij->i", x, x)[:, None] + self._norms[None, :] - 2 * x @ self._x.T
+        k = min(self.k, len(self._y))
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        return self._y[nearest].mean(axis=1)
+
+
+class LinearSurrogate(Surrogate):
+    def __init__(self, regularization=1e-3):
+        self.regularization = regularization
+        self._coefficients = None
+
+    @staticmethod
+    def _with_intercept(x):
+        return np.hstack((x, np.ones((len(x), 1))))
+
+    def fit(self, x, y):
+        # ridge regression, the intercept is not regularized
+        x = self._with_intercept(x)
+        penalty = self.regularization * np.eye(x.shape[1])
+        penalty[-1, -1] = 0
+        self._coefficients = np.linalg.lstsq(x.T @ x + penalty, x.T @ y, rcond=None)[0]
+
+    def predict(self, x):
+        return self._with_intercept(x) @ self._coefficients
+
+
+def _rank_correlation(a, b):
+    if len(a) < 2:
+        return None
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return None
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+class SurrogateScreener:
+    def __init__(self, surrogate, evaluated_fraction, exploration_fraction=0.1, retrain_interval=1,
+                 min_training_size=20, max_training_size=1000, min_candidate_ratio=1.5):
+        if not isinstance(surrogate, Surrogate):
+            raise TypeError("surrogate must be a Surrogate, not {}.".format(surrogate.__class__.__name__))
+        if not 0 < evaluated_fraction <= 1:
+            raise ValueError("evaluated_fraction must be in (0, 1].")
+        if not 0 <= exploration_fraction <= 1:
+            raise ValueError("exploration_fraction must be in [0, 1].")
+        self.surrogate = surrogate
+        self.evaluated_fraction = evaluated_fraction
+        self.exploration_fraction = exploration_fraction
+        self.retrain_interval = retrain_interval
+        self.min_training_size = min_training_size
+        self.min_candidate_ratio = min_candidate_ratio
+        self._x = deque(maxlen=max_training_size)
+        self._y = deque(maxlen=max_training_size)
+        self._screen_cnt = 0
+        self._predictions = {}
+
+        self.screened_cnt = 0
+        self.saved_cnt = 0
+        self.prediction_cnt = 0
+        self.absolute_error_sum = 0.0
+        self.rank_correlation = None
+
+    def get_mean_absolute_error(self):
+        return self.absolute_error_sum / self.prediction_cnt if self.prediction_cnt else None
+
+    def add(self, genes):
+        # the genes have been evaluated, they are learned from and their predictions are scored
+        predicted = []
+        actual = []
+        for gene in genes:
+            self._x.append(list(gene))
+            self._y.append(gene.fitness)
+            prediction = self._predictions.pop(id(gene), None)
+            if prediction is not None:
+                predicted.append(prediction)
+                actual.append(gene.fitness)
+        self._predictions = {}
+        if predicted:
+            self.prediction_cnt += len(predicted)
+            self.absolute_error_sum += float(np.abs(np.array(predicted) - np.array(actual, dtype=float)).sum())
+            self.rank_correlation = _rank_correlation(predicted, actual)
+
+    def screen(self, genes, discardable_cnt):
+        # returns the genes worth evaluating, at most discardable_cnt of them are left out
+        self._predictions = {}
+        if len(self._y) < self.min_training_size or discardable_cnt <= 0 or not genes:
+            return genes
+        if self._screen_cnt % self.retrain_interval == 0:
+            self.surrogate.fit(np.array(self._x, dtype=float), np.array(self._y, dtype=float))
+        self._screen_cnt += 1
+
+        predictions = self.surrogate.predict(np.array([list(gene) for gene in genes], dtype=float))
+        evaluated_cnt = max(ceil(self.evaluated_fraction * len(genes)), len(genes) - discardable_cnt)
+        # a part of the evaluated genes are chosen at random, so that the model also learns where it is wrong
+        exploration_cnt = min(round(self.exploration_fraction * evaluated_cnt), len(genes) - evaluated_cnt)
+        order = sorted(range(len(genes)), key=lambda i: -predictions[i])
+        chosen = order[:evaluated_cnt - exploration_cnt] + sample(order[evaluated_cnt - exploration_cnt:],
+                                                                  exploration_cnt)
+        chosen.sort()
+
+        for i in chosen:
+            self._predictions[id(genes[i])] = float(predictions[i])
+        self.screened_cnt += len(genes)
+        self.saved_cnt += len(genes) - len(chosen)
+        return [genes[i] for i in chosen]
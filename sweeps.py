@@ -0,0 +1,148 @@
+import json
+import sys
+from itertools import product
+from math import ceil
+from multiprocessing import Pool
+from random import Random
+
+from .interfaces import BudgetExhaustedException
+
+
+class GridSearch:
+    def __init__(self, space):
+        self.space = space
+
+    def __iter__(self):
+        names = list(self.space)
+        for values in product(*(self.space[name] for name in names)):
+            yield dict(zip(names, values))
+
+
+class RandomSearch:
+    def __init__(self, space, config_cnt, seed=None):
+        self.space = space
+        self.config_cnt = config_cnt
+        self.seed = seed
+
+    def __iter__(self):
+        rnd = Random(self.seed)
+        for _ in range(self.config_cnt):
+            yield {name: values(rnd) if callable(values) else rnd.choice(values)
+                   for name, values in self.space.items()}
+
+
+def _run_task(task):
+    solver_factory, run_id, config, seed, state, generation_limit = task
+    solver = solver_factory(config)
+    if state is None:
+        random = sys.modules["random"]
+        random.seed(seed)
+        numpy = sys.modules.get("numpy")
+        if numpy is not None:
+            numpy.random.seed(seed)
+    else:
+        # continue the run where the previous rung stopped it, as if it had never been stopped
+        solver._restore_checkpoint_state(state)
+
+    best = None
+    terminated = False
+    try:
+        for population, best, generation_cnt in solver._iter_generations(state):
+            if generation_cnt == 0:
+                continue
+            terminated = solver._terminate(population, best, generation_cnt)
+            if terminated or (generation_limit is not None and generation_cnt >= generation_limit):
+                break
+    except BudgetExhaustedException:
+        if best is None:
+            raise
+        solver._finish()
+        terminated = True
+
+    state = None if terminated else solver._get_checkpoint_state(population, best, generation_cnt)
+    return run_id, best, generation_cnt, solver.get_evaluation_cnt(), terminated, state
+
+
+class Sweep:
+    def __init__(self, solver_factory, search, seeds, results_file=None, workers=None, rungs=(),
+                 reduction_factor=3):
+        if not seeds:
+            raise ValueError("At least one seed must be given.")
+        if list(rungs) != sorted(set(rungs)) or (rungs and rungs[0] < 1):
+            raise ValueError("rungs must be increasing generation counts, at least 1.")
+        if reduction_factor <= 1:
+            raise ValueError("reduction_factor must be greater than 1.")
+        self.solver_factory = solver_factory
+        self.search = search
+        self.seeds = seeds
+        self.results_file = results_file
+        self.workers = workers
+        self.rungs = rungs
+        self.reduction_factor = reduction_factor
+        self.results = []
+        self.best = None
+        self.best_config = None
+
+    def _write(self, f, record):
+        if f is not None:
+            f.write("{}\n".format(json.dumps(record, default=repr)))
+            f.flush()
+
+    def _run_rung(self, pool, f, results, rung, generation_limit):
+        tasks = [(self.solver_factory, (result["config_id"], i), result["config"], run["seed"], run.pop("state"),
+                  generation_limit)
+                 for result in results for i, run in enumerate(result["runs"]) if not run["terminated"]]
+        by_id = {result["config_id"]: result for result in results}
+
+        for (config_id, i), best, generation_cnt, evaluation_cnt, terminated, state in \
+                pool.imap_unordered(_run_task, tasks):
+            result = by_id[config_id]
+            run = result["runs"][i]
+            run.update(best=best.fitness, generation_cnt=generation_cnt, evaluation_cnt=evaluation_cnt,
+                       terminated=terminated, state=state)
+            if self.best is None or best.fitness > self.best.fitness:
+                self.best, self.best_config = best, result["config"]
+            self._write(f, {"type": "run", "rung": rung, "config_id": config_id, "config": result["config"],
+                            "seed": run["seed"], "best": best.fitness, "generation_cnt": generation_cnt,
+                            "evaluation_cnt": evaluation_cnt, "terminated": terminated})
+
+        for result in results:
+            result["rung"] = rung
+            result["score"] = sum(run["best"] for run in result["runs"]) / len(result["runs"])
+            result["completed"] = all(run["terminated"] for run in result["runs"])
+
+    def run(self):
+        results = [{"config_id": config_id, "config": config, "rung": None, "score": None, "completed": False,
+                    "runs": [{"seed": seed, "terminated": False, "state": None} for seed in self.seeds]}
+                   for config_id, config in enumerate(self.search)]
+        self.results = list(results)
+        f = open(self.results_file, "w") if self.results_file else None
+
+        try:
+            with Pool(self.workers) as pool:
+                # the configurations are compared after each rung, only the best 1/reduction_factor of them go on;
+                # after the last rung, the remaining ones run until their terminators stop them
+                limits = list(self.rungs) + [None]
+                for rung, generation_limit in enumerate(limits):
+                    self._run_rung(pool, f, results, rung, generation_limit)
+                    if generation_limit is None:
+                        break
+
+                    results.sort(key=lambda x: -x["score"])
+                    kept = ceil(len(results) / self.reduction_factor)
+                    for result in results[kept:]:
+                        self._write(f, {"type": "pruned", "rung": rung, "config_id": result["config_id"],
+                                        "config": result["config"], "score": result["score"]})
+                        for run in result["runs"]:
+                            run["state"] = None
+                    # configurations whose runs have all been stopped by their terminators are complete
+                    results = [result for result in results[:kept] if not result["completed"]]
+        finally:
+            if f is not None:
+                f.close()
+
+        for result in self.results:
+            for run in result["runs"]:
+                run.pop("state", None)
+        self.results.sort(key=lambda x: (not x["completed"], -x["rung"], -x["score"]))
+        return self.best_config
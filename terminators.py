@@ -1,3 +1,5 @@
+from time import monotonic
+
 from .interfaces import Terminator
 
 
@@ -24,6 +26,12 @@ class NoImprovementTerminator(Terminator):
 
         return self._generation_cnt >= self.generation_limit
 
+    def get_state(self):
+        return self._best_fitness, self._generation_cnt
+
+    def set_state(self, state):
+        self._best_fitness, self._generation_cnt = state
+
 
 class FitnessDegenerationTerminator(Terminator):
     def __init__(self, population_percentage_limit, fitness_threshold=0.0):
@@ -32,6 +40,8 @@ class FitnessDegenerationTerminator(Terminator):
 
     def _num_best_fitness(self, population):
         best = population[0].fitness
+        if best > 0 and hasattr(population, "count_above"):
+            return population.count_above(best - self.fitness_threshold * best)
         cnt = 0
         for item in population:
             if (best - item.fitness)/best < self.fitness_threshold:
@@ -47,3 +57,59 @@ class FitnessDegenerationTerminator(Terminator):
 class RunForeverTerminator(Terminator):
     def __call__(self, population, best, generation_cnt):
         return False
+
+
+class TimeLimitTerminator(Terminator):
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._deadline = None
+
+    def start(self, solver):
+        self._deadline = monotonic() + self.seconds
+
+    def is_exhausted(self):
+        return self._deadline is not None and monotonic() >= self._deadline
+
+    def __call__(self, population, best, generation_cnt):
+        return self.is_exhausted()
+
+
+class EvaluationBudgetTerminator(Terminator):
+    def __init__(self, evaluation_limit):
+        self.evaluation_limit = evaluation_limit
+        self._evaluation_cnt_fn = None
+
+    def start(self, solver):
+        self._evaluation_cnt_fn = solver.get_evaluation_cnt
+
+    def is_exhausted(self):
+        return self._evaluation_cnt_fn is not None and self._evaluation_cnt_fn() >= self.evaluation_limit
+
+    def __call__(self, population, best, generation_cnt):
+        return self.is_exhausted()
+
+
+class AnyTerminator(Terminator):
+    def __init__(self, *terminators):
+        self.terminators = terminators
+
+    def start(self, solver):
+        for terminator in self.terminators:
+            if hasattr(terminator, "start"):
+                terminator.start(solver)
+
+    def is_exhausted(self):
+        return any(terminator.is_exhausted() for terminator in self.terminators if hasattr(terminator, "is_exhausted"))
+
+    def __call__(self, population, best, generation_cnt):
+        # all the terminators are called, as some of them keep state between generations
+        return any([terminator(population, best, generation_cnt) for terminator in self.terminators])
+
+    def get_state(self):
+        return [terminator.get_state() if hasattr(terminator, "get_state") else None
+                for terminator in self.terminators]
+
+    def set_state(self, state):
+        for terminator, terminator_state in zip(self.terminators, state):
+            if hasattr(terminator, "set_state"):
+                terminator.set_state(terminator_state)